@@ -1,9 +1,32 @@
 import socket
 import cv2
+import inspect
 import io
+import queue
+import struct
+import threading
+import time
 from PIL import Image
 import numpy as np
 
+# 使用 libjpeg-turbo（PyTurboJPEG）解码JPEG，SIMD加速且可直接输出BGR，省去颜色转换
+# 安装：pip install PyTurboJPEG；未安装时回退到 PIL 解码
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    tj = TurboJPEG()
+except Exception:
+    tj = None
+
+# 新版 PyTurboJPEG 的 decode 支持直接解码到已有的数组中（参数名为 dst），旧版本不支持
+TJ_DECODE_DST = tj is not None and "dst" in inspect.signature(tj.decode).parameters
+
+# 启用 OpenCV 的 SIMD 优化路径（cvtColor、imshow 等），并限制内部线程数
+# 接收、解码线程已占用CPU核心，过多的 OpenCV 线程反而会互相争抢
+cv2.setUseOptimized(True)
+cv2.setNumThreads(2)
+
+WINDOW_NAME = "ESP32 Capture Image"
+
 # 创建一个UDP套接字
 s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
 
@@ -16,28 +39,196 @@ s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
 """
 s.bind(("0.0.0.0", 9090))
 
-# 无限循环，持续接收数据
-while True:
-    # 从套接字接收数据并储存在data中，最大缓冲区大小为100000字节
-    # 同时获取发送数据的IP地址
-    data, IP = s.recvfrom(100000)
-    
+# 增大接收缓冲区到12MB，避免解码卡顿时内核因缓冲区满而整帧丢包
+# 注意：Linux下需要 sysctl -w net.core.rmem_max=12582912 才能让内核真正使用该大小
+s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 12 * 1024 * 1024)
+
+# 接收、解码、显示分别在不同线程中进行，相互之间用容量很小的队列连接
+# 队列满时丢弃最旧的数据，保证显示的总是最新的画面，延迟不会无限增长
+jpeg_queue = queue.Queue(maxsize=2)   # 原始JPEG数据 (buf, n, IP)
+frame_queue = queue.Queue(maxsize=2)  # 解码后的图像 (img, IP)
+running = True
+
+# ESP32 端将每帧JPEG拆分为不超过 CHUNK 字节的小包发送，每个小包带6字节包头：
+# 帧号、分片序号、分片总数（均为大端 uint16），接收端在此重新拼装
+CHUNK = 1400
+HEADER_SIZE = 6
+MAX_CHUNKS = 128                     # 单帧最多分片数（约179KB）
+FRAME_TIMEOUT = 2 / 15               # 约2个帧间隔内未收齐的帧直接丢弃
+
+# 预先分配的帧缓冲区池，避免每帧都新建 bytes 对象
+# 缓冲区个数 = 队列容量 + 解码中 + 拼装中的帧 + 余量
+FRAME_BUF_SIZE = CHUNK * MAX_CHUNKS
+free_buffers = queue.Queue()
+for _ in range(jpeg_queue.maxsize + 6):
+    free_buffers.put(bytearray(FRAME_BUF_SIZE))
+
+
+def put_latest(q, item, on_drop=None):
+    """放入队列，队列已满时丢弃最旧的一项（on_drop 用于回收被丢弃的项）"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                dropped = q.get_nowait()
+            except queue.Empty:
+                continue
+            if on_drop is not None:
+                on_drop(dropped)
+
+
+def recycle_buffer(item):
+    """将被丢弃的帧对应的缓冲区放回缓冲区池"""
+    free_buffers.put(item[0])
+
+
+# 预先分配的解码输出数组（轮流使用），避免每帧重新申请约460KB的图像内存
+# 个数 = 显示队列容量 + 正在显示 + 正在解码；分辨率变化时重新分配
+out_buffers = []
+out_index = 0
+
+
+def get_out_buffer(height, width):
+    """取出下一个可用于解码输出的 (height, width, 3) 数组"""
+    global out_buffers, out_index
+    if not out_buffers or out_buffers[0].shape[:2] != (height, width):
+        out_buffers = [np.empty((height, width, 3), dtype=np.uint8)
+                       for _ in range(frame_queue.maxsize + 2)]
+    out_index = (out_index + 1) % len(out_buffers)
+    return out_buffers[out_index]
+
+
+def decode_jpeg(data):
+    """将JPEG字节数据解码为BGR格式的numpy数组"""
+    if tj is not None:
+        # TurboJPEG 直接解码为 BGR 格式（opencv的数据格式）
+        if TJ_DECODE_DST:
+            width, height = tj.decode_header(data)[:2]
+            return tj.decode(data, pixel_format=TJPF_BGR, dst=get_out_buffer(height, width))
+        return tj.decode(data, pixel_format=TJPF_BGR)
+
     # 将接收到的字节数据放入字节流中
     bytes_stream = io.BytesIO(data)
-    
+
     # 使用PIL库打开字节流中的图像（RGB）
     image = Image.open(bytes_stream)
-    
+
     # 将PIL图像转换为numpy数组（opencv的数据格式）
     img = np.asarray(image)
-    
+
     # 将图像的颜色格式从RGB转换为BGR，以匹配OpenCV的格式
-    img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-    
-    # 使用OpenCV显示图像，并设置窗口标题为"ESP32 Capture Image"
-    cv2.imshow("ESP32 Capture Image", img)
-    print("Received image from IP:", IP[0])
-    
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
+def acquire_buffer(pending):
+    """从缓冲区池取出一个帧缓冲区；池已空时回收最早的未完成帧"""
+    try:
+        return free_buffers.get_nowait()
+    except queue.Empty:
+        pass
+    if pending:
+        oldest = min(pending, key=lambda k: pending[k]["start"])
+        return pending.pop(oldest)["buf"]
+    return free_buffers.get()
+
+
+def receive_loop():
+    """接收线程：持续从套接字接收分片并拼装成完整的JPEG帧"""
+    # 设置超时，便于退出时线程能及时结束
+    s.settimeout(0.5)
+    # 单个分片的接收缓冲区（复用），略大于 包头+CHUNK 以容纳异常数据包
+    packet = bytearray(2048)
+    packet_mv = memoryview(packet)
+    pending = {}  # 帧号 -> 拼装中的帧信息
+
+    while running:
+        try:
+            # 直接接收到预分配的缓冲区中，size 为实际接收的字节数
+            # 同时获取发送数据的IP地址
+            size, IP = s.recvfrom_into(packet)
+        except socket.timeout:
+            continue
+        if size < HEADER_SIZE:
+            continue
+
+        fid, idx, n = struct.unpack_from('!HHH', packet, 0)
+        if n == 0 or n > MAX_CHUNKS or idx >= n:
+            continue
+
+        now = time.monotonic()
+        frame = pending.get(fid)
+        if frame is None:
+            # 丢弃超时仍未收齐的帧
+            for old in [k for k, f in pending.items() if now - f["start"] > FRAME_TIMEOUT]:
+                free_buffers.put(pending.pop(old)["buf"])
+            frame = {"buf": acquire_buffer(pending), "flags": bytearray(n), "count": 0,
+                     "n": n, "length": 0, "start": now}
+            pending[fid] = frame
+
+        if frame["flags"][idx]:  # 重复的分片
+            continue
+        frame["flags"][idx] = 1
+        frame["count"] += 1
+
+        # 将分片数据复制到帧缓冲区中对应的位置
+        offset = idx * CHUNK
+        payload = size - HEADER_SIZE
+        frame["buf"][offset:offset + payload] = packet_mv[HEADER_SIZE:size]
+        if idx == n - 1:
+            frame["length"] = offset + payload
+
+        if frame["count"] == frame["n"]:
+            del pending[fid]
+            # 比这一帧更早开始的未完成帧已经过时，不再等待
+            for old in [k for k, f in pending.items() if f["start"] <= frame["start"]]:
+                free_buffers.put(pending.pop(old)["buf"])
+            put_latest(jpeg_queue, (frame["buf"], frame["length"], IP), on_drop=recycle_buffer)
+
+
+def decode_loop():
+    """解码线程：将JPEG数据解码为图像"""
+    while running:
+        try:
+            buf, n, IP = jpeg_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        try:
+            # memoryview 切片不会复制数据
+            img = decode_jpeg(memoryview(buf)[:n])
+        except Exception as e:
+            print("图像解码失败: ", e)
+            continue
+        finally:
+            free_buffers.put(buf)
+        put_latest(frame_queue, (img, IP))
+
+
+# 优先创建 OpenGL 窗口，由GPU完成图像的绘制；OpenCV 未编译 OpenGL 支持时退回普通窗口
+try:
+    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_OPENGL | cv2.WINDOW_AUTOSIZE)
+except cv2.error:
+    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_AUTOSIZE)
+
+threading.Thread(target=receive_loop, daemon=True).start()
+threading.Thread(target=decode_loop, daemon=True).start()
+
+# 主线程只负责显示
+while True:
+    try:
+        img, IP = frame_queue.get(timeout=0.05)
+    except queue.Empty:
+        img = None
+
+    if img is not None:
+        # 使用OpenCV显示图像，并设置窗口标题为"ESP32 Capture Image"
+        cv2.imshow(WINDOW_NAME, img)
+        print("Received image from IP:", IP[0])
+
     # 检查是否按下'q'键，如果是则退出循环
     if cv2.waitKey(1) == ord("q"):
-        break
\ No newline at end of file
+        break
+
+running = False
+cv2.destroyAllWindows()
@@ -2,6 +2,7 @@ import socket
 import network
 import camera
 import time
+import struct
 
 
 # 连接WiFi并添加错误处理
@@ -15,9 +16,12 @@ try:
         print('connecting to network...')
         wlan.connect('她只是经过~', '10203040')
 
-        # 循环等待连接成功
+        # 循环等待连接成功，每次休眠200ms让出CPU，最多等待15秒
+        t0 = time.ticks_ms()
         while not wlan.isconnected():
-            pass
+            if time.ticks_diff(time.ticks_ms(), t0) > 15000:
+                raise OSError('wifi timeout')
+            time.sleep_ms(200)
     print('网络配置:', wlan.ifconfig())
 except Exception as e:
     print("WiFi连接失败: ", e)
@@ -66,17 +70,51 @@ try:
     # AF_INET 表示使用 IPv4 协议，SOCK_DGRAM 表示使用 UDP 协议
     # 0 表示匹配前面的协议——自动选择与 SOCK_DGRAM 类型配套的协议（即 UDP）
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, 0)
+
+    # 增大发送缓冲区（部分固件不支持 SO_SNDBUF，失败时忽略）
+    try:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+    except Exception as e:
+        print("设置发送缓冲区失败: ", e)
 except Exception as e:
     print("UDP Socket创建失败: ", e)
 
 # 主循环，捕获和发送图像数据
+# 目标帧间隔（毫秒），约15fps；只休眠扣除拍摄和发送耗时后的剩余时间
+TARGET_DT_MS = 1000 // 15
+
+# 分片发送：每帧拆成不超过 CHUNK 字节的小包，避免IP层分片（丢一个分片就丢整帧）
+# 每个小包前加6字节包头：帧号、分片序号、分片总数（均为大端 uint16）
+CHUNK = 1400
+HEADER_SIZE = 6
+SERVER_ADDR = ("192.168.1.106", 9090)
+packet = bytearray(HEADER_SIZE + CHUNK)  # 复用的发送包缓冲区
+packet_mv = memoryview(packet)
+fid = 0
+
+
+def send_frame(buf):
+    """将一帧JPEG数据分片发送到服务器"""
+    global fid
+    fid = (fid + 1) & 0xffff
+    mv = memoryview(buf)
+    n = (len(buf) + CHUNK - 1) // CHUNK
+    for i in range(n):
+        part = mv[i * CHUNK:(i + 1) * CHUNK]
+        struct.pack_into('!HHH', packet, 0, fid, i, n)
+        packet[HEADER_SIZE:HEADER_SIZE + len(part)] = part
+        s.sendto(packet_mv[:HEADER_SIZE + len(part)], SERVER_ADDR)
+
+
 try:
     while True:
         try:
-            print("捕获图像并发送")
+            t0 = time.ticks_ms()
             buf = camera.capture()  # 获取图像数据
-            s.sendto(buf, ("192.168.1.106", 9090))  # 向服务器发送图像数据
-            time.sleep(0.1)
+            send_frame(buf)  # 向服务器发送图像数据
+            dt = time.ticks_diff(time.ticks_ms(), t0)
+            if dt < TARGET_DT_MS:
+                time.sleep_ms(TARGET_DT_MS - dt)
         except Exception as e:
             print("图像捕获或发送失败: ", e)
             break
@@ -1,6 +1,7 @@
 import sys
 import socket
 import threading
+import queue
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
                             QWidget, QPushButton, QLabel, QTextEdit, QHBoxLayout)
 from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer
@@ -19,7 +20,7 @@ class ControlThread(QThread):
         super().__init__()
         self.camera_config = camera_config
         self._mutex = threading.Lock()
-        self._command_queue = []
+        self._command_queue = queue.Queue()  # 指令队列，工作线程阻塞等待
         self._active = True
         self._connected = False
         self._socket = None
@@ -30,11 +31,12 @@ class ControlThread(QThread):
     def run(self):
         """主线程循环"""
         while self._active:
-            if self._command_queue:
-                cmd = self._command_queue.pop(0)
-                self._process_command(cmd)
-            else:
-                self.msleep(50)
+            try:
+                # 阻塞等待指令到达；超时只用于定期检查 _active
+                cmd = self._command_queue.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            self._process_command(cmd)
 
     def connect_camera(self):
         """主动连接摄像头"""
@@ -55,6 +57,9 @@ class ControlThread(QThread):
             self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._socket.settimeout(5)
             self._socket.connect((self.ip_address, self.control_port))
+            # 指令只有单字节，关闭Nagle算法避免每条指令额外等待；开启保活以便尽快发现断线
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             self._connected = True
             self.reconnect_attempts = 0
             self.connection_changed.emit(True)
@@ -107,8 +112,7 @@ class ControlThread(QThread):
             self.connection_error.emit("指令必须为单字符")
             return False
 
-        with self._mutex:
-            self._command_queue.append(command_char)
+        self._command_queue.put(command_char)
         return True
 
     def stop(self):
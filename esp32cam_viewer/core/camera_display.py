@@ -4,8 +4,12 @@ from PyQt5.QtWidgets import QLabel, QSizePolicy
 from PyQt5.QtGui import QPixmap, QPainter, QImage, QFont, QColor, QPen, QFontMetrics
 from PyQt5.QtCore import Qt, QSize, QRect
 import numpy as np
+import time
 import cv2 # 需要导入 cv2 用于颜色转换
 
+# Qt >= 5.14 支持 BGR888，可直接显示 OpenCV 的 BGR 帧；旧版本退回 RGB888 + rgbSwapped()
+_FORMAT_BGR888 = getattr(QImage, "Format_BGR888", None)
+
 class CameraDisplay(QLabel):
     """
     增强型视频显示组件，支持显示视频帧、未连接状态，并能绘制ROI和参考线。
@@ -16,8 +20,12 @@ class CameraDisplay(QLabel):
     属性说明：
     _connected: 当前连接状态 (bool)
     _mosaic_cache: 缓存的马赛克背景 (QImage)
-    current_frame: 当前存储的原始视频帧 (np.ndarray, BGR格式)
-    current_pixmap: 当前用于显示的缩放后的QPixmap
+    _disconnected_pixmap_cache: 缓存的未连接画面，已包含提示文字 (QPixmap)
+    current_frame: 当前存储的视频帧 (np.ndarray, BGR格式)，可能是按控件尺寸缩小后的帧
+    source_size: 当前帧对应的原始帧尺寸 (w, h)，ROI 坐标基于该尺寸换算
+    target_size: 控件当前尺寸 (w, h)，供视频线程预先缩小帧（普通元组，可在其他线程中读取）
+    current_qimage: 当前帧对应的QImage（引用 current_frame 的内存），在 paintEvent 中直接绘制
+    current_pixmap: 当前用于显示的缩放后的QPixmap（仅 use_pixmap_path 为 True 时使用）
     roi_rect: 当前设置的ROI区域 (x, y, w, h) 或 None，坐标基于原始帧
     """
     def __init__(self, parent=None):
@@ -29,14 +37,31 @@ class CameraDisplay(QLabel):
         self.setAlignment(Qt.AlignCenter)
         self.setMinimumSize(640, 480)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # paintEvent 每次都会先填充整个控件区域，Qt 无需再额外擦除背景
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
 
         # 状态变量初始化
         self._connected = False
         self._mosaic_cache = None
-        self.current_frame = None     # 存储原始 BGR 帧
-        self.current_pixmap = None    # 存储准备显示的 QPixmap
+        self._disconnected_pixmap_cache = None  # 缓存的未连接画面（背景+文字）
+        self._disconnected_cache_size = None    # 上述缓存对应的控件尺寸
+        self.current_frame = None     # 存储 BGR 帧
+        self.source_size = None       # 原始帧尺寸 (w, h)
+        self.target_size = (self.width(), self.height())
+        self.current_qimage = None    # 存储准备显示的 QImage
+        self.current_pixmap = None    # 存储准备显示的 QPixmap（预缩放路径）
         self.roi_rect = None          # 存储 ROI 矩形 (x, y, w, h)
 
+        # 缩放算法选择：帧率超过该值时使用 FastTransformation（可按需调整）
+        self.fast_transform_fps = 15
+        self._display_fps = 0.0       # 估算的显示帧率
+        self._last_frame_time = None  # 上一帧到达时间
+        self._transform_mode = Qt.FastTransformation
+
+        # 默认在 paintEvent 中直接 drawImage，由绘制引擎在贴图时完成缩放，省去每帧的 QPixmap 拷贝
+        # 在光栅绘制较慢的平台上可设为 True，回退到预先缩放 QPixmap 的方式
+        self.use_pixmap_path = False
+
         # 不再需要 self.update_display()，paintEvent 会处理初始状态
         self.update() # 触发初始绘制
 
@@ -49,41 +74,88 @@ class CameraDisplay(QLabel):
             if not connected:
                 # 断开连接时，清除帧和pixmap信息
                 self.current_frame = None
+                self.current_qimage = None
                 self.current_pixmap = None
                 self.roi_rect = None # 也清除ROI
             # else: 连接成功时不需要立即做什么，等待 update_frame 或 paintEvent
             self.update() # 请求重新绘制
 
-    def update_frame(self, frame: np.ndarray):
+    def update_frame(self, frame: np.ndarray, source_size: tuple = None):
         """
-        更新视频帧显示。接收 RGB 格式的 numpy 数组。
+        更新视频帧显示。接收 BGR 格式的 numpy 数组。
+        :param source_size: 帧在缩小前的原始尺寸 (w, h)；未缩小时为 None
         """
-        # 存储原始 RGB 帧
+        # 存储 BGR 帧（同时保证 QImage 引用的内存在显示期间不会被释放）
         self.current_frame = frame
+        if frame is not None:
+            self.source_size = source_size or (frame.shape[1], frame.shape[0])
 
         if self._connected and self.current_frame is not None:
             try:
                 h, w, ch = self.current_frame.shape
                 if ch == 3: # 确保是彩色图像
-                    bytes_per_line = 3 * w
-                    qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-
-                    # 将 QImage 转换为 QPixmap 并缩放以适应 QLabel 的当前大小，保持纵横比
-                    # 将缩放后的结果存储在 self.current_pixmap 中，供 paintEvent 使用
-                    self.current_pixmap = QPixmap.fromImage(qt_image).scaled(
-                        self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-                    )
-                else: # 如果不是3通道图像，则清空 pixmap
+                    bytes_per_line = frame.strides[0]
+                    if _FORMAT_BGR888 is not None:
+                        qt_image = QImage(frame.data, w, h, bytes_per_line, _FORMAT_BGR888)
+                    else:
+                        qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
+
+                    target = self.size()
+                    self._transform_mode = self._select_transform_mode(w, h, target)
+                    self.current_qimage = qt_image
+
+                    if self.use_pixmap_path:
+                        # 将 QImage 转换为 QPixmap 并缩放以适应 QLabel 的当前大小，保持纵横比
+                        # 将缩放后的结果存储在 self.current_pixmap 中，供 paintEvent 使用
+                        if w == target.width() and h == target.height():
+                            # 帧尺寸与控件一致，无需缩放
+                            self.current_pixmap = QPixmap.fromImage(qt_image)
+                        else:
+                            self.current_pixmap = QPixmap.fromImage(qt_image).scaled(
+                                target, Qt.KeepAspectRatio, self._transform_mode
+                            )
+                    else:
+                        self.current_pixmap = None
+                else: # 如果不是3通道图像，则清空图像
+                    self.current_qimage = None
                     self.current_pixmap = None
 
             except Exception as e:
                 print(f"[CameraDisplay] 转换帧时出错: {e}")
-                self.current_pixmap = None # 出错时清除
+                self.current_qimage = None # 出错时清除
+                self.current_pixmap = None
 
             # 请求重新绘制控件，让 paintEvent 来显示图像和可能的叠加层
             self.update()
         # 如果未连接或帧为空，则不处理，paintEvent 会绘制相应状态
 
+    def _select_transform_mode(self, w, h, target):
+        """
+        根据帧率和缩放比例选择缩放算法。
+        帧率高于 fast_transform_fps 或缩放比例接近1（<1.5倍）时使用 FastTransformation，
+        否则使用画质更好的 SmoothTransformation。
+        """
+        now = time.monotonic()
+        if self._last_frame_time is not None:
+            interval = now - self._last_frame_time
+            if interval > 0:
+                # 指数滑动平均，平滑帧率抖动
+                self._display_fps = 0.9 * self._display_fps + 0.1 * (1.0 / interval)
+        self._last_frame_time = now
+
+        if self._display_fps > self.fast_transform_fps:
+            return Qt.FastTransformation
+        ratio = max(w / max(1, target.width()), h / max(1, target.height()))
+        if 1 / 1.5 < ratio < 1.5:
+            return Qt.FastTransformation
+        return Qt.SmoothTransformation
+
+    def _image_target_rect(self, w, h):
+        """计算保持纵横比、在控件中居中显示 w x h 图像的目标矩形"""
+        scale = min(self.width() / w, self.height() / h)
+        tw, th = int(w * scale), int(h * scale)
+        return QRect((self.width() - tw) // 2, (self.height() - th) // 2, tw, th)
+
     # +++ 新增方法 +++
     def get_current_frame(self):
         """返回当前存储的原始 OpenCV 视频帧 (BGR格式)。"""
@@ -112,32 +184,40 @@ class CameraDisplay(QLabel):
 
         if not self._connected:
             # --- 绘制未连接状态 ---
-            if self._mosaic_cache is None or self._mosaic_cache.size() != self.size():
-                 if self.size().width() > 0 and self.size().height() > 0:
-                     self._mosaic_cache = self.create_mosaic_background()
-                 else:
-                     self._mosaic_cache = None
+            # 马赛克背景和文字烘焙到同一个 QPixmap 中，尺寸不变时直接贴图
+            if self._disconnected_pixmap_cache is None or self._disconnected_cache_size != self.size():
+                self._disconnected_pixmap_cache = self.create_disconnected_pixmap()
+                self._disconnected_cache_size = self.size()
 
-            if self._mosaic_cache:
-                 painter.drawImage(0, 0, self._mosaic_cache)
-
-            self.draw_connection_text(painter, self.size())
+            if self._disconnected_pixmap_cache:
+                painter.drawPixmap(0, 0, self._disconnected_pixmap_cache)
 
         else:
             # --- 绘制已连接状态 ---
+            target_rect = None
             if self.current_pixmap:
                 # 计算绘制Pixmap的位置，使其在QLabel中居中显示
                 px = (self.width() - self.current_pixmap.width()) // 2
                 py = (self.height() - self.current_pixmap.height()) // 2
                 painter.drawPixmap(px, py, self.current_pixmap)
+                target_rect = QRect(px, py, self.current_pixmap.width(), self.current_pixmap.height())
+            elif self.current_qimage is not None and self.width() > 0 and self.height() > 0:
+                # 直接绘制 QImage，缩放在贴图时一次完成
+                target_rect = self._image_target_rect(self.current_qimage.width(), self.current_qimage.height())
+                painter.setRenderHint(QPainter.SmoothPixmapTransform,
+                                      self._transform_mode == Qt.SmoothTransformation)
+                painter.drawImage(target_rect, self.current_qimage, self.current_qimage.rect())
+
+            if target_rect is not None:
+                px, py = target_rect.x(), target_rect.y()
 
                 # --- 如果设置了ROI，则绘制水平ROI边界和水平参考线 ---
-                if self.roi_rect and self.current_frame is not None:
-                    frame_h, frame_w = self.current_frame.shape[:2]
+                if self.roi_rect and self.source_size is not None:
+                    frame_w, frame_h = self.source_size
                     if frame_w > 0 and frame_h > 0:
                         # 计算缩放比例
-                        scale_w = self.current_pixmap.width() / frame_w
-                        scale_h = self.current_pixmap.height() / frame_h
+                        scale_w = target_rect.width() / frame_w
+                        scale_h = target_rect.height() / frame_h
 
                         # 计算缩放和平移后的ROI坐标 (基于原始帧ROI)
                         scaled_roi_x = int(px + self.roi_rect[0] * scale_w)
@@ -175,20 +255,44 @@ class CameraDisplay(QLabel):
                 painter.setPen(QColor(200, 200, 200)) # 浅灰色
                 painter.drawText(self.rect(), Qt.AlignCenter, "视频加载中...")
 
+    def resizeEvent(self, event):
+        """尺寸变化时使未连接状态的缓存失效，并记录新的控件尺寸"""
+        self._disconnected_pixmap_cache = None
+        self._disconnected_cache_size = None
+        self.target_size = (event.size().width(), event.size().height())
+        super().resizeEvent(event)
+
+    def create_disconnected_pixmap(self):
+        """生成未连接状态的完整画面（马赛克背景 + 提示文字），尺寸无效时返回 None"""
+        size = self.size()
+        if size.width() <= 0 or size.height() <= 0:
+            self._mosaic_cache = None
+            return None
+
+        if self._mosaic_cache is None or self._mosaic_cache.size() != size:
+            self._mosaic_cache = self.create_mosaic_background()
+
+        pixmap = QPixmap.fromImage(self._mosaic_cache)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_connection_text(painter, size)
+        painter.end()
+        return pixmap
+
     # --- 以下方法保持不变 ---
     def create_mosaic_background(self):
         """创建马赛克纹理背景"""
         size = self.size()
         block_size = 20
-        # 使用 uint8 确保与 QImage 兼容
-        img = np.zeros((size.height(), size.width(), 3), dtype=np.uint8)
-
-        for y in range(0, size.height(), block_size):
-            for x in range(0, size.width(), block_size):
-                # 生成稍暗的灰色，避免太亮
-                gray_val = np.random.randint(40, 80)
-                color = (gray_val, gray_val, gray_val)
-                img[y:y+block_size, x:x+block_size] = color
+        h, w = size.height(), size.width()
+        # 每个马赛克块只采样一个灰度值（稍暗的灰色，避免太亮），向上取整以覆盖边缘不完整的块
+        bh = -(-h // block_size)
+        bw = -(-w // block_size)
+        small = np.random.randint(40, 80, (bh, bw, 1), dtype=np.uint8)
+        # 一次性放大到块尺寸并裁剪到控件大小，代替逐块的 Python 循环
+        # 使用 uint8 确保与 QImage 兼容；ascontiguousarray 保证 QImage 可直接读取内存
+        img = np.broadcast_to(small, (bh, bw, 3)).repeat(block_size, 0).repeat(block_size, 1)
+        img = np.ascontiguousarray(img[:h, :w])
 
         height, width, channel = img.shape
         # BGR -> RGB (虽然这里是灰度，但保持通道顺序一致性)
@@ -1,5 +1,8 @@
+import atexit
 import json
 import os
+import tempfile
+from PyQt5.QtCore import QTimer
 
 class CameraManager:
     """
@@ -13,6 +16,11 @@ class CameraManager:
     属性：
     cameras (dict): 存储所有摄像头配置，格式为 {name: {ip: str, port: str}}
     config_file (str): 配置文件路径
+    pretty (bool): 是否以缩进格式保存（默认紧凑格式，文件更小）
+    
+    说明：
+    增删改操作只标记配置为“已修改”，并在 SAVE_DELAY_MS 毫秒后统一写入一次文件，
+    连续多次修改只会产生一次写入；程序退出时会自动写入尚未保存的修改。
     
     使用示例：
     >>> manager = CameraManager()
@@ -20,16 +28,23 @@ class CameraManager:
     >>> manager.get_camera_list()
     ['客厅摄像头']
     """
-    def __init__(self, config_file="cameras.json"):
+    SAVE_DELAY_MS = 500  # 延迟写入时间（毫秒）
+
+    def __init__(self, config_file="cameras.json", pretty=False):
         """
         初始化摄像头管理器
         
         参数：
         config_file (str): 配置文件路径，默认为当前目录的cameras.json
+        pretty (bool): 是否使用缩进格式保存
         """
         self.cameras = {}  # 摄像头配置字典
         self.config_file = config_file  # 配置文件路径
+        self.pretty = pretty
+        self._dirty = False  # 是否有尚未写入文件的修改
+        self._last_written = None  # 最近一次写入（或加载）的文件内容，内容未变化时跳过写入
         self.load_cameras()  # 加载已有配置
+        atexit.register(self.flush)
 
     def load_cameras(self):
         """
@@ -55,7 +70,9 @@ class CameraManager:
         说明：
         - 自动创建不存在的目录（如果是带路径的文件名）
         - 如果只是纯文件名，则保存到当前目录
-        - 使用美观的格式化输出（indent=4）
+        - 默认紧凑格式输出，pretty=True 时使用缩进格式（indent=4）
+        - 先写入同目录下的临时文件并刷到磁盘（fsync），再原子替换原文件，写入中途出错或断电不会损坏原配置
+        - 内容与上次写入的相同时跳过写入
         """
         # 获取目录路径（如果是纯文件名则返回None）
         dir_path = os.path.dirname(self.config_file)
@@ -64,9 +81,36 @@ class CameraManager:
         if dir_path:  # 非空字符串时才创建目录
             os.makedirs(dir_path, exist_ok=True)
         
-        # 保存文件
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(self.cameras, f, indent=4, ensure_ascii=False)
+        data = json.dumps(self.cameras, indent=4 if self.pretty else None,
+                          ensure_ascii=False).encode('utf-8')
+        if data == self._last_written:
+            self._dirty = False
+            return
+
+        # 保存文件（64KB 缓冲区一次写出）
+        fd, tmp_path = tempfile.mkstemp(dir=dir_path or ".", suffix=".tmp")
+        try:
+            with open(fd, 'wb', buffering=64 * 1024) as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self._last_written = data
+        self._dirty = False
+
+    def _schedule_save(self):
+        """标记配置已修改，延迟 SAVE_DELAY_MS 毫秒后写入，期间的多次修改合并为一次写入"""
+        if not self._dirty:
+            self._dirty = True
+            QTimer.singleShot(self.SAVE_DELAY_MS, self.flush)
+
+    def flush(self):
+        """立即写入尚未保存的修改"""
+        if self._dirty:
+            self.save_cameras()
 
 
     def add_camera(self, name, ip, port):
@@ -88,7 +132,7 @@ class CameraManager:
             "ip": str(ip).strip(),
             "port": str(port).strip()
         }
-        self.save_cameras()
+        self._schedule_save()
 
     def remove_camera(self, name):
         """
@@ -102,7 +146,7 @@ class CameraManager:
         """
         if name in self.cameras:
             del self.cameras[name]
-            self.save_cameras()
+            self._schedule_save()
 
     def get_camera_list(self):
         """
@@ -151,5 +195,5 @@ class CameraManager:
         if port:
             self.cameras[name]["port"] = str(port).strip()
             
-        self.save_cameras()
+        self._schedule_save()
         return True
@@ -1,10 +1,17 @@
+import queue
+import selectors
 import socket
+import time
+from collections import deque
 from PyQt5.QtCore import QThread, pyqtSignal
 
 class ControlThread(QThread):
     """
     ESP32-CAM控制线程
     实现通过单个字符指令进行控制：L - 开灯, l - 关灯, P - 拍照
+
+    指令以流水线方式发送：发送端将队列中的指令直接写入socket，不等待上一条的应答；
+    接收端按发送顺序把收到的应答字节依次匹配给最早未应答的指令。
     """
     command_sent = pyqtSignal(str, bool)   # 指令发送完成信号
     connection_error = pyqtSignal(str)     # 连接错误信号
@@ -17,6 +24,10 @@ class ControlThread(QThread):
         self._connected = False
         self._socket = None
         self._light_on = False
+        self._selector = None
+        self._q = queue.Queue()        # 待发送的指令
+        self._outstanding = deque()    # 已发送、等待应答的指令 (指令, 发送时间)
+        self.reply_timeout = 10        # 应答超时时间（秒）
 
     def run(self):
         """线程主循环，管理连接状态并处理指令"""
@@ -24,12 +35,13 @@ class ControlThread(QThread):
             if not self._connected:
                 # 如果未连接，尝试建立连接
                 if not self._establish_connection():
-                    # 连接失败，等待一段时间后重试
+                    # 连接失败，排队中的指令全部判为失败，等待一段时间后重试
+                    self._fail_queued()
                     self.msleep(5000)  # 等待 5 秒
                     continue
 
-            # 保持连接状态，等待指令
-            self.msleep(100)  # 短暂休眠，避免占用过多 CPU
+            # 发送排队的指令并处理收到的应答
+            self._pump()
 
         # 线程被请求中断，清理资源
         self._cleanup_socket()
@@ -41,6 +53,11 @@ class ControlThread(QThread):
             self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._socket.settimeout(10)
             self._socket.connect((self.ip_address, self.control_port))
+            # 指令只有单字节，关闭Nagle算法避免每条指令额外等待；开启保活以便尽快发现断线
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._socket, selectors.EVENT_READ)
             self._connected = True
             print ("\n---------------------------------------------------------------")
             print(f"控制端口连接成功: {self.ip_address}:{self.control_port}")
@@ -52,37 +69,86 @@ class ControlThread(QThread):
             self.connection_error.emit(f"连接失败: {str(e)}")
             return False
 
-    def _process_command(self, command_char):
-        """处理单个字符指令"""
-        if not self._connected and not self._establish_connection():
-            self.command_sent.emit(command_char, False)
-            return
-
+    def _pump(self):
+        """发送排队的指令（不等待应答），并把收到的应答匹配给最早发出的指令"""
+        command_char = None
         try:
-            self._socket.sendall(command_char.encode('ascii'))
-            response = self._socket.recv(1)
-            
-            # 验证响应是否正常
-            success = (response == b'\x31')  # 检查响应是否为ASCII '1'的二进制
-            
-            # 处理灯光状态变化
-            if command_char == 'L':  # 开灯
-                self._light_on = True
-                self.light_state_changed.emit(True)
-            elif command_char == 'l':  # 关灯
-                self._light_on = False
-                self.light_state_changed.emit(False)
-
-            self.command_sent.emit(command_char, success)
-            
+            if not self._outstanding:
+                # 没有等待中的应答时阻塞等待新指令
+                try:
+                    command_char = self._q.get(timeout=0.1)
+                except queue.Empty:
+                    return
+                self._send(command_char)
+
+            # 发送端：把队列中剩余的指令一次性写入socket
+            while True:
+                try:
+                    command_char = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                self._send(command_char)
+            command_char = None
+
+            # 接收端：等待应答字节，按顺序匹配
+            if self._selector.select(timeout=0.02):
+                data = self._socket.recv(64)
+                if not data:
+                    raise ConnectionError("连接已被对端关闭")
+                for byte in data:
+                    if not self._outstanding:
+                        break
+                    self._process_reply(self._outstanding.popleft()[0], byte)
+            elif self._outstanding and time.monotonic() - self._outstanding[0][1] > self.reply_timeout:
+                raise socket.timeout("等待应答超时")
+
         except Exception as e:
+            failed = [c for c, _ in self._outstanding]
+            self._outstanding.clear()
+            if command_char is not None:
+                failed.append(command_char)
             self._cleanup_socket()
-            error_msg = f"{command_char}指令错误: {str(e)}"
-            self.connection_error.emit(error_msg)
+            self.connection_error.emit(f"{''.join(failed)}指令错误: {str(e)}")
+            for c in failed:
+                self.command_sent.emit(c, False)
+
+    def _send(self, command_char):
+        """写入单个指令并记录为等待应答"""
+        self._socket.sendall(command_char.encode('ascii'))
+        self._outstanding.append((command_char, time.monotonic()))
+
+    def _process_reply(self, command_char, response):
+        """处理单个指令的应答字节"""
+        # 验证响应是否正常
+        success = (response == 0x31)  # 检查响应是否为ASCII '1'
+
+        # 处理灯光状态变化
+        if command_char == 'L':  # 开灯
+            self._light_on = True
+            self.light_state_changed.emit(True)
+        elif command_char == 'l':  # 关灯
+            self._light_on = False
+            self.light_state_changed.emit(False)
+
+        self.command_sent.emit(command_char, success)
+
+    def _fail_queued(self):
+        """未连接时，将排队中的指令全部判为失败"""
+        while True:
+            try:
+                command_char = self._q.get_nowait()
+            except queue.Empty:
+                return
             self.command_sent.emit(command_char, False)
 
     def _cleanup_socket(self):
         """清理socket资源"""
+        if self._selector:
+            try:
+                self._selector.close()
+            except:
+                pass
+        self._selector = None
         if self._socket:
             try:
                 self._socket.close()
@@ -94,12 +160,12 @@ class ControlThread(QThread):
             self.connection_status.emit(False)
 
     def send_command(self, command_char):
-        """直接发送单个字符指令"""
+        """将单个字符指令放入发送队列，由线程异步发送，结果通过 command_sent 信号返回"""
         if command_char not in ('L', 'l', 'P', '1', '2', '3', '4', '5'):
             self.connection_error.emit("无效指令")
             return False
         
-        self._process_command(command_char)
+        self._q.put(command_char)
         return True
 
     def turn_light_on(self):
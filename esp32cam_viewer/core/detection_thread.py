@@ -1,10 +1,49 @@
-import cv2, os, time
+import cv2, os, time, hashlib, threading, queue
+import numpy as np
 from datetime import datetime
-from ultralytics import YOLO
 from PyQt5.QtCore import QThread, pyqtSignal, QObject
-from queue import Queue, Full
-import os
-os.environ["YOLO_VERBOSE"] = "False"
+from concurrent.futures import ThreadPoolExecutor
+
+# 可选：numba 即时编译黑线扫描，未安装时使用 OpenCV 的阈值+形态学+轮廓流程
+# numba 和 ultralytics 导入较慢，延迟到第一次创建检测线程时才导入，不拖慢程序启动
+_scan_black_line = None
+_scan_kernel_loaded = False
+
+
+def _scan_black_line_py(gray, thresh, min_area, tol, row_start):
+    """
+    单次遍历灰度图从 row_start 行到底部的条带：阈值判断与计数合并在同一循环中，
+    统计暗像素（<= thresh）数量及坐标和，计算质心。
+    返回 (质心是否到达底部, cx, cy)，暗像素不足 min_area 时返回 (False, -1, -1)。
+    """
+    h, w = gray.shape
+    count = 0
+    sum_x = 0
+    sum_y = 0
+    for r in range(row_start, h):
+        for c in range(w):
+            if gray[r, c] <= thresh:
+                count += 1
+                sum_x += c
+                sum_y += r
+    if count <= min_area:
+        return False, -1, -1
+    cx = sum_x // count
+    cy = sum_y // count
+    return cy >= h - tol, cx, cy
+
+
+def _get_scan_kernel():
+    """首次调用时导入 numba 并编译黑线扫描函数；numba 未安装时返回 None"""
+    global _scan_black_line, _scan_kernel_loaded
+    if not _scan_kernel_loaded:
+        _scan_kernel_loaded = True
+        try:
+            from numba import njit
+            _scan_black_line = njit(cache=True, fastmath=True, nogil=True, boundscheck=False)(_scan_black_line_py)
+        except Exception:
+            _scan_black_line = None
+    return _scan_black_line
 
 class DetectionThread(QThread):
     detection_result = pyqtSignal(int, bool)  # (格子ID, 有无种子)
@@ -15,12 +54,23 @@ class DetectionThread(QThread):
         super().__init__(parent)
         self.frame_source = frame_source_callable
         self.roi = roi
+        self._roi_slices = None             # 缓存的ROI裁剪切片 (行, 列)
+        self._roi_frame_shape = None        # 上述切片对应的帧尺寸
         self.model_path = model_path
         self.save_path_base = save_path
         self.running = False
         self.count = 2  # 总格子数，可以按需调整
         self.max_area = 100
         self.crossing_tolerance = 10
+        self.line_scale = 4                 # 黑线检测前ROI的缩小倍数
+        self.line_scan_pad = 20             # 判定黑线穿越时在底部容差带之上额外统计的行数（原始像素），应不小于黑线宽度的一半
+        # 黑线检测复用的缓冲区（首次检测时按ROI尺寸分配）
+        self._gray_buf = None
+        self._small_buf = None
+        self._morph_buf = None
+        self._line_kernel = None
+        self._line_buf_scale = 1
+        self._scan_black_line = _get_scan_kernel()
 
         # --- 新增状态变量 ---
         self.detection_active = False       # 初始不启用YOLO检测
@@ -30,7 +80,24 @@ class DetectionThread(QThread):
         self.seed_detected_this_frame = False  # 当前帧是否检测到种子
         self.last_black_line_time = time.time()  # 最后检测到黑线时间
 
-        self.frame_queue = Queue(maxsize=12)
+        # 单槽“最新帧”：生产者（视频线程）直接覆盖，检测线程取走最新的一帧，过时的帧自然被丢弃
+        self._latest_frame = None
+        self._latest_lock = threading.Lock()
+        self._last_frame = None             # 上一次处理的帧，避免重复处理同一帧
+
+        # 跨帧微批处理：攒够 batch_size 帧的ROI后一次送入YOLO，摊薄每次推理的固定开销
+        # 格子切换或线程停止前会先处理掉未满的批次，保证结果归属正确的格子
+        self.batch_size = 4
+        self._batch = []                    # [(roi, frame_copy), ...]
+
+        # YOLO推理放到单独的工作线程中执行，与下一帧的获取、黑线检测重叠进行
+        # 同一时间最多只有一个批次在推理中；yolo_stride > 1 时每 N 帧只送1帧给YOLO（黑线检测仍逐帧进行）
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._inflight = None               # (future, batch)
+        self.yolo_stride = 1
+        self._active_frame_count = 0
+        self.min_inference_interval_s = 0.05  # 两次送检帧之间的最小间隔（秒）
+        self._last_infer_t = 0.0
 
         # 调试保存目录
         self.debug_save_path = None
@@ -42,33 +109,95 @@ class DetectionThread(QThread):
                 self.debug_save_path = None
                 print(f"[SeedDetector] 创建调试目录失败: {e}")
 
-        self.model = YOLO(self.model_path)
+        # 调试图片由后台线程编码并写入磁盘，检测循环只做非阻塞的入队
+        self._save_q = None
+        if self.debug_save_path:
+            self._save_q = queue.Queue(maxsize=64)
+            threading.Thread(target=self._save_worker, daemon=True).start()
+
+        # 推理输入尺寸：ROI 长边向上取整到32的倍数（YOLO要求）
+        self.imgsz = max(32, -(-max(roi[2], roi[3]) // 32) * 32)
+
+        # 有 CUDA 时使用 torch 组批：ROI 直接拷入锁页内存中的批次缓冲区，异步传到GPU
+        try:
+            import torch
+            self._torch = torch if torch.cuda.is_available() else None
+        except Exception:
+            self._torch = None
+        self._batch_buf = None              # 锁页内存 (batch_size, imgsz, imgsz, 3) uint8
+        self._batch_np = None               # 上述缓冲区的 numpy 视图
+        self._gpu_u8 = None                 # GPU 上的 uint8 暂存区，接收锁页内存的异步拷贝
+        self._infer_tensor = None           # GPU 上常驻的推理输入张量 (batch_size, 3, imgsz, imgsz)
+        self._half = False                  # 推理输入是否使用 FP16（加载 TensorRT FP16 引擎时为 True）
+
+        self.model = self._load_model()
+        # 绘制检测框用的标签前缀和字体，避免在逐框循环中重复查找
+        self._label_prefix = f"{self.model.names[0]}:"
+        self._font = cv2.FONT_HERSHEY_SIMPLEX
+
+    def _load_model(self):
+        """
+        加载YOLO模型。首次运行时把 .pt 模型导出为加速推理格式并缓存在 .pt 文件旁边：
+        有 NVIDIA GPU 时导出 TensorRT（FP16），否则导出 OpenVINO；之后直接加载缓存的文件。
+        缓存文件名带 (模型路径, 输入尺寸, 设备) 的哈希，任一变化都会重新导出。
+        导出失败时退回原始 PyTorch 模型。
+        """
+        from ultralytics import YOLO  # 延迟导入：导入 ultralytics 会加载 torch，耗时较长
+
+        if not self.model_path.endswith(".pt"):
+            return YOLO(self.model_path)
+
+        device = "cuda" if self._torch is not None else "cpu"
+        fmt = "engine" if device == "cuda" else "openvino"
+
+        key = hashlib.md5(f"{os.path.abspath(self.model_path)}|{self.imgsz}|{self.batch_size}|{device}".encode()).hexdigest()[:8]
+        stem = os.path.splitext(self.model_path)[0]
+        cached = f"{stem}_{key}.engine" if fmt == "engine" else f"{stem}_{key}_openvino_model"
+
+        try:
+            if not os.path.exists(cached):
+                print(f"[SeedDetector] 首次运行，正在导出{fmt}模型，请稍候...")
+                # dynamic=True 使导出的模型支持 1~batch_size 的任意批大小（未满的批次也能直接推理）
+                exported = YOLO(self.model_path).export(format=fmt, half=True, imgsz=self.imgsz,
+                                                        batch=self.batch_size, dynamic=True)
+                os.replace(exported, cached)
+            model = YOLO(cached, task="detect")
+            self._half = fmt == "engine"
+            return model
+        except Exception as e:
+            print(f"[SeedDetector] 导出加速模型失败，使用原始模型: {e}")
+            return YOLO(self.model_path)
 
     def run(self):
         self.running = True
         self.status_updated.emit("检测线程启动")
 
         while self.running:
-            frame = self.frame_source()
+            # 上一批次推理完成后处理其结果
+            if self._inflight is not None and self._inflight[0].done():
+                self._collect_results()
+
+            frame = self._take_latest_frame()
             if frame is None:
                 time.sleep(0.01)
                 continue
 
-            x, y, width, height = self.roi
-            frame_h, frame_w = frame.shape[:2]
-            roi_x = max(0, x)
-            roi_y = max(0, y)
-            roi_w = min(width, frame_w - roi_x)
-            roi_h = min(height, frame_h - roi_y)
-
-            if roi_w <=0 or roi_h <=0:
+            # 裁剪后的ROI范围只在帧尺寸或ROI变化时重新计算
+            if frame.shape[:2] != self._roi_frame_shape:
+                self._update_roi_slices(frame.shape[:2])
+            if self._roi_slices is None:
                 self.error_occurred.emit("ROI区域无效")
                 time.sleep(0.1)
                 continue
 
-            roi = frame[roi_y:roi_y+roi_h, roi_x:roi_x+roi_w]
-            frame_copy = frame.copy()
-            cv2.rectangle(frame_copy, (x,y),(x+width,y+height),(255,0,0),2)
+            x, y, width, height = self.roi
+            roi = frame[self._roi_slices]
+            # 只有保存调试图像时才需要带ROI框的整帧副本，否则省去每帧的整帧拷贝
+            if self.debug_save_path:
+                frame_copy = frame.copy()
+                cv2.rectangle(frame_copy, (x,y),(x+width,y+height),(255,0,0),2)
+            else:
+                frame_copy = None
 
             # 检测黑线状态
             current_black_line_state, binary_image = self.detect_black_line(roi)
@@ -85,6 +214,7 @@ class DetectionThread(QThread):
                         self.status_updated.emit("首次检测到黑线，启动YOLO检测，开始第1格子统计")
                     else:
                         # 后续每检测到黑线，意味着前面的格子检测结束，发送结果并进入新格子统计
+                        self._flush_batch(wait=True)
                         self.detection_result.emit(self.current_grid_id, self.grid_seed_detected)
                         self.current_grid_id += 1
                         self.grid_seed_detected = False
@@ -101,67 +231,233 @@ class DetectionThread(QThread):
             if self.detection_active and (time.time() - self.last_black_line_time) > 5:
                 self.status_updated.emit("超过5秒未检测到黑线，停止检测线程")
                 # 最后一个格子结果发送
+                self._flush_batch(wait=True)
                 self.detection_result.emit(self.current_grid_id, self.grid_seed_detected)
                 self.stop()
                 break
 
-            # YOLO检测，仅激活时进行
-            self.seed_detected_this_frame = False
-            if self.detection_active:
-                try:
-                    results = self.model(roi, conf=0.5, verbose=False)
-                except Exception as e:
-                    self.error_occurred.emit(f"YOLO异常: {e}")
-                    results = []
-
-                for result in results:
-                    if len(results) > 0:
-                        self.seed_detected_this_frame = True
-                        for box in result.boxes:
-                            x1,y1,x2,y2 = map(int, box.xyxy[0].tolist())
-                            conf = float(box.conf)
-                            cv2.rectangle(roi,(x1,y1),(x2,y2),(0,255,0),2)
-                            cv2.putText(roi,f"{result.names[0]}:{conf:.2f}",(x1,y1-5),cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,255,0),1)
-
-                # 累积格子内是否检测到过种子
-                if self.seed_detected_this_frame:
-                    self.grid_seed_detected = True
-
-                # 只有检测到种子时保存调试图片，文件名带格子ID
-                if self.seed_detected_this_frame and self.debug_save_path:
-                    self.save_debug_image(frame_copy, roi, self.current_grid_id)
+            # YOLO检测，仅激活时进行：先加入批次，攒满后统一推理
+            # 当前格子已确认有种子时结果不会再变，直到下一条黑线前都跳过推理；并限制送检的最小时间间隔
+            if self.detection_active and not self.grid_seed_detected:
+                self._active_frame_count += 1
+                now = time.monotonic()
+                if (self._active_frame_count % self.yolo_stride == 0
+                        and now - self._last_infer_t >= self.min_inference_interval_s):
+                    self._last_infer_t = now
+                    self._batch.append((roi, frame_copy))
+                    if len(self._batch) >= self.batch_size:
+                        self._flush_batch()
+            elif self._batch:
+                self._batch.clear()  # 格子已确认有种子，未提交的帧无需再推理
 
             time.sleep(0.01)
 
+        self._batch.clear()
+        self._inflight = None
+        self._executor.shutdown(wait=True)
+        if self._save_q is not None:
+            self._save_q.put(None)  # 通知保存线程写完剩余图片后退出
         self.status_updated.emit("检测线程停止")
 
+    def set_roi(self, roi):
+        """更新ROI，下一帧时重新计算裁剪范围"""
+        self.roi = roi
+        self._roi_frame_shape = None
+
+    def _update_roi_slices(self, frame_shape):
+        """按帧尺寸裁剪ROI并缓存为切片；ROI无效时缓存 None"""
+        x, y, width, height = self.roi
+        frame_h, frame_w = frame_shape
+        roi_x = max(0, x)
+        roi_y = max(0, y)
+        roi_w = min(width, frame_w - roi_x)
+        roi_h = min(height, frame_h - roi_y)
+        self._roi_frame_shape = frame_shape
+        if roi_w <=0 or roi_h <=0:
+            self._roi_slices = None
+        else:
+            self._roi_slices = (slice(roi_y, roi_y+roi_h), slice(roi_x, roi_x+roi_w))
+
+    def push_frame(self, frame):
+        """生产者接口：放入最新帧（覆盖尚未处理的旧帧），可在视频线程中直接调用"""
+        with self._latest_lock:
+            self._latest_frame = frame
+
+    def _take_latest_frame(self):
+        """取走最新帧；没有推送的新帧时从 frame_source 获取。与上次处理的是同一帧时返回 None"""
+        with self._latest_lock:
+            frame = self._latest_frame
+            self._latest_frame = None
+        if frame is None and self.frame_source is not None:
+            frame = self.frame_source()
+        if frame is None or frame is self._last_frame:
+            return None
+        self._last_frame = frame
+        return frame
+
+    def _flush_batch(self, wait=False):
+        """
+        将当前批次提交给推理线程做一次YOLO前向推理。
+        已有批次在推理中时先等待并处理其结果；wait=True 时等待本批次结果处理完再返回
+        （格子切换前使用，保证所有帧的结果都计入当前格子）。
+        """
+        if self._batch:
+            if self._inflight is not None:
+                self._collect_results()
+            batch, self._batch = self._batch, []
+            source = self._make_batch_tensor([roi for roi, _ in batch])
+            if source is None:
+                # 列表输入会被 Ultralytics 组成一个批次张量，一次前向完成
+                source = [roi for roi, _ in batch]
+            future = self._executor.submit(self.model, source,
+                                           conf=0.5, imgsz=self.imgsz, verbose=False)
+            self._inflight = (future, batch)
+        if wait and self._inflight is not None:
+            self._collect_results()
+
+    def _make_batch_tensor(self, rois):
+        """
+        把批次中的ROI拷入预分配的锁页内存缓冲区 (NHWC)，转换为 GPU 上归一化的 RGB NCHW 张量。
+        ROI 放在 imgsz x imgsz 画布的左上角、其余部分填充灰色（与YOLO的letterbox一致），
+        检测框坐标因此直接对应ROI坐标。无 CUDA 或ROI超出画布时返回 None。
+        """
+        torch = self._torch
+        if torch is None:
+            return None
+        if self._batch_buf is None:
+            shape = (self.batch_size, self.imgsz, self.imgsz, 3)
+            self._batch_buf = torch.full(shape, 114, dtype=torch.uint8).pin_memory()
+            self._batch_np = self._batch_buf.numpy()
+            self._gpu_u8 = torch.empty(shape, dtype=torch.uint8, device="cuda")
+            # 输入直接使用模型的精度，Ultralytics 不会再做类型转换和复制
+            self._infer_tensor = torch.empty((self.batch_size, 3, self.imgsz, self.imgsz),
+                                             dtype=torch.float16 if self._half else torch.float32,
+                                             device="cuda")
+
+        n = len(rois)
+        for i, roi in enumerate(rois):
+            h, w = roi.shape[:2]
+            if h > self.imgsz or w > self.imgsz:
+                return None
+            np.copyto(self._batch_np[i, :h, :w], roi)
+
+        # 上一批次的结果已在提交本批次前处理完，此时改写各缓冲区是安全的
+        # 锁页内存 -> GPU 异步拷贝，之后的转换都在 GPU 上完成，不再分配新张量
+        self._gpu_u8[:n].copy_(self._batch_buf[:n], non_blocking=True)
+        out = self._infer_tensor[:n]
+        # NHWC BGR uint8 -> NCHW RGB 0~1 浮点（copy_ 同时完成类型转换）
+        out.copy_(self._gpu_u8[:n].permute(0, 3, 1, 2).flip(1))
+        return out.div_(255)
+
+    def _collect_results(self):
+        """等待推理中的批次完成，并按帧累积当前格子的检测结果"""
+        future, batch = self._inflight
+        self._inflight = None
+        try:
+            results = future.result()
+        except Exception as e:
+            self.error_occurred.emit(f"YOLO异常: {e}")
+            return
+
+        label_prefix = self._label_prefix
+        font = self._font
+        for (roi, frame_copy), result in zip(batch, results):
+            self.seed_detected_this_frame = False
+            if len(result.boxes) > 0:
+                self.seed_detected_this_frame = True
+                for box in result.boxes:
+                    x1,y1,x2,y2 = map(int, box.xyxy[0].tolist())
+                    conf = float(box.conf)
+                    cv2.rectangle(roi,(x1,y1),(x2,y2),(0,255,0),2)
+                    cv2.putText(roi,label_prefix + f"{conf:.2f}",(x1,y1-5),font,0.5,(0,255,0),1)
+
+            # 累积格子内是否检测到过种子
+            if self.seed_detected_this_frame:
+                self.grid_seed_detected = True
+
+            # 只有检测到种子时保存调试图片，文件名带格子ID
+            if self.seed_detected_this_frame and self.debug_save_path:
+                self.save_debug_image(frame_copy, roi, self.current_grid_id)
+
+    def _ensure_line_buffers(self, roi_h, roi_w):
+        """按ROI尺寸（惰性）分配黑线检测用的复用缓冲区，尺寸不变时直接复用"""
+        if self._gray_buf is not None and self._gray_buf.shape == (roi_h, roi_w):
+            return
+        # 定位水平黑线不需要全分辨率：缩小 line_scale 倍后再处理；ROI 太小时不缩放
+        self._line_buf_scale = self.line_scale if min(roi_h, roi_w) >= self.line_scale * 4 else 1
+        scale = self._line_buf_scale
+        self._gray_buf = np.empty((roi_h, roi_w), dtype=np.uint8)
+        self._small_buf = np.empty((roi_h // scale, roi_w // scale), dtype=np.uint8) if scale > 1 else self._gray_buf
+        self._morph_buf = np.empty_like(self._small_buf)
+        # 缩小后的图像使用 3x3 结构元素，与原图 5x5 的作用范围相当
+        ksize = (3,3) if scale > 1 else (5,5)
+        self._line_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, ksize)
+
     def detect_black_line(self, roi):
-        frame_gay = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        _, frame_gay = cv2.threshold(frame_gay, 100, 255, cv2.THRESH_BINARY_INV)
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5,5))
-        frame_gay = cv2.morphologyEx(frame_gay, cv2.MORPH_CLOSE, kernel)
+        roi_h, roi_w = roi.shape[:2]
+        self._ensure_line_buffers(roi_h, roi_w)
+        scale = self._line_buf_scale
+
+        # 各步骤都写入预先分配的缓冲区（dst=），避免每帧分配新数组
+        frame_gay = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+        # 后续各步的像素数减少 scale² 倍；面积阈值按缩放比例换算，质心坐标换算回原始ROI坐标
+        if scale > 1:
+            frame_gay = cv2.resize(frame_gay, (roi_w // scale, roi_h // scale),
+                                   dst=self._small_buf, interpolation=cv2.INTER_AREA)
+        area_scale = scale * scale
+
+        # 只需判断黑线质心是否进入底部容差带，因此只统计底部 (容差 + 余量) 的条带
+        # 两条路径使用相同的阈值、条带和面积下限，是否保存调试图像不影响判定结果
+        strip = -(-(self.crossing_tolerance + self.line_scan_pad) // scale)
+        row_start = max(0, frame_gay.shape[0] - strip)
+        min_count = max(self.max_area, 100) // area_scale
+
+        if self._scan_black_line is not None and not self.debug_save_path:
+            # 不保存调试图像时无需可视化结果，用 numba 单次遍历代替阈值/矩计算
+            _, _, cy = self._scan_black_line(frame_gay, 100, min_count, self.crossing_tolerance, row_start)
+            return cy >= 0 and cy * scale >= roi_h - self.crossing_tolerance, None
+        cv2.threshold(frame_gay, 100, 255, cv2.THRESH_BINARY_INV, dst=frame_gay)
+        # 对条带二值图求矩（一次遍历），binaryImage=True 时 m00 即为黑色像素数（面积）
+        M = cv2.moments(frame_gay[row_start:], binaryImage=True)
+        cy = int(M["m01"]/M["m00"]) + row_start if M["m00"] > min_count else -1
+        crossed = cy >= 0 and cy * scale >= roi_h - self.crossing_tolerance
+        if not self.debug_save_path:
+            return crossed, None
+        # 可视化结果只在保存调试图像时生成：闭运算后的整幅二值图，标出条带内的质心
+        frame_gay = cv2.morphologyEx(frame_gay, cv2.MORPH_CLOSE, self._line_kernel, dst=self._morph_buf)
         frame_bgr = cv2.cvtColor(frame_gay, cv2.COLOR_GRAY2BGR)
-        contours, _ = cv2.findContours(frame_gay, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            largest_contour = max(contours, key=cv2.contourArea)
-            area = cv2.contourArea(largest_contour)
-            if area > self.max_area:
-                cv2.drawContours(frame_bgr, [largest_contour], -1, (0,255,0), 2)
-                M = cv2.moments(largest_contour)
-                if M["m00"] > 100:
-                    cx = int(M["m10"]/M["m00"])
-                    cy = int(M["m01"]/M["m00"])
-                    cv2.circle(frame_bgr,(cx,cy),5,(0,255,0),-1)
-                    return cy >= roi.shape[0] - self.crossing_tolerance, frame_bgr
-        return False, frame_bgr
+        if cy >= 0:
+            cx = int(M["m10"]/M["m00"])
+            cv2.circle(frame_bgr,(cx,cy),5,(0,255,0),-1)
+        return crossed, frame_bgr
+
+    def _save_worker(self):
+        """后台保存线程：依次把队列中的图片编码为JPEG并写入磁盘，收到 None 时退出"""
+        while True:
+            item = self._save_q.get()
+            if item is None:
+                break
+            path, img = item
+            try:
+                cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            except Exception as e:
+                print(f"[SeedDetector] 保存图片失败: {e}")
+
+    def _queue_save(self, path, img):
+        """将图片放入保存队列；队列已满时丢弃，不阻塞检测循环"""
+        try:
+            self._save_q.put_nowait((path, img))
+        except queue.Full:
+            print(f"[SeedDetector] 保存队列已满，丢弃图片: {path}")
 
     def save_debug_image(self, frame, roi, grid_id):
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
             filename = os.path.join(self.debug_save_path, f"grid{grid_id}_seed_{timestamp}_result.jpg")
             filename_roi = os.path.join(self.debug_save_path, f"grid{grid_id}_seed_{timestamp}_roi.jpg")
-            cv2.imwrite(filename_roi, cv2.cvtColor(roi, cv2.COLOR_BGR2RGB))
-            cv2.imwrite(filename, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            # roi 是视频帧的视图，写入前帧内容可能变化，需要复制；frame 已是独立的副本
+            self._queue_save(filename_roi, roi.copy())
+            self._queue_save(filename, frame)
         except Exception as e:
             print(f"[SeedDetector] 保存调试图片失败: {e}")
 
@@ -172,8 +468,9 @@ class DetectionThread(QThread):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
             full_path = os.path.join(self.debug_save_path, f"{event_name}_{timestamp}_full.jpg")
             roi_path = os.path.join(self.debug_save_path, f"{event_name}_{timestamp}_roi.jpg")
-            cv2.imwrite(full_path, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            cv2.imwrite(roi_path, cv2.cvtColor(roi, cv2.COLOR_BGR2RGB))
+            # frame 和 roi（二值可视化图）都是本帧新建的数组，无需再复制
+            self._queue_save(full_path, frame)
+            self._queue_save(roi_path, roi)
         except Exception as e:
             print(f"[SeedDetector] 保存事件图像失败: {e}")
 
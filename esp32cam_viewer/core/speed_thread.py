@@ -4,6 +4,8 @@ import cv2
 import numpy as np
 import time
 import os
+import queue
+import threading
 from PyQt5.QtCore import QThread, pyqtSignal, QObject
 from datetime import datetime
 
@@ -12,6 +14,48 @@ MARKER_DISTANCE_M = 0.04  # 标记间的实际距离 (4cm = 0.04米)
 NUM_WHITE_MARKERS = 11     # 白色标记的数量
 TOTAL_MARKERS = 0 + NUM_WHITE_MARKERS # 总标记数 (0黑 + 11白)
 
+# 可选：numba 即时编译窄带扫描，未安装时使用 OpenCV + NumPy 的列投影流程
+# numba 导入较慢，延迟到第一次创建速度标定线程时才导入
+_scan_band = None
+_scan_kernel_loaded = False
+
+
+def _scan_band_py(band, thresh, col_min):
+    """
+    单次遍历BGR窄带：灰度化（与 cv2.COLOR_BGR2GRAY 相同的定点系数）、二值化和按列计数合并在同一循环中。
+    某列亮像素（> thresh）数超过 col_min 时认为该列被标记覆盖。
+    返回 (被覆盖的列数, 第一个被覆盖的列, 最后一个被覆盖的列)，没有被覆盖的列时后两项为 -1。
+    """
+    h, w = band.shape[0], band.shape[1]
+    n_covered = 0
+    x0 = -1
+    x1 = -1
+    for c in range(w):
+        count = 0
+        for r in range(h):
+            gray = (band[r, c, 0] * 1868 + band[r, c, 1] * 9617 + band[r, c, 2] * 4899 + 8192) >> 14
+            if gray > thresh:
+                count += 1
+        if count > col_min:
+            n_covered += 1
+            if x0 < 0:
+                x0 = c
+            x1 = c
+    return n_covered, x0, x1
+
+
+def _get_scan_kernel():
+    """首次调用时导入 numba 并编译窄带扫描函数；numba 未安装时返回 None"""
+    global _scan_band, _scan_kernel_loaded
+    if not _scan_kernel_loaded:
+        _scan_kernel_loaded = True
+        try:
+            from numba import njit
+            _scan_band = njit(cache=True, nogil=True, boundscheck=False)(_scan_band_py)
+        except Exception:
+            _scan_band = None
+    return _scan_band
+
 class SpeedCalculationThread(QThread):
     """
     通过分析视频帧中标记穿越中心参考线来计算传送带速度的线程。
@@ -25,10 +69,12 @@ class SpeedCalculationThread(QThread):
     status_update = pyqtSignal(str)                         # 信号：发送状态更新文本
     # marker_detected_signal = pyqtSignal(object, float, str) # 信号：发送已检测到的标记信息 (marker_index, timestamp, marker_type)
 
-    def __init__(self, frame_source_callable: callable, roi_rect: tuple, save_path: str, time_limit: float, parent: QObject = None):
+    def __init__(self, frame_source_callable: callable, roi_rect: tuple, save_path: str, time_limit: float,
+                 frame_event: threading.Event = None, parent: QObject = None):
         """
         初始化速度计算线程。
         :param frame_source_callable: 获取帧的回调函数。
+        :param frame_event: 视频线程每到一帧置位一次的事件；提供时按帧到达驱动检测，否则按固定间隔轮询。
         :param roi_rect: ROI区域 (x, y, w, h)。
         :param save_path: 保存调试图像的基础路径。
         :param parent: Qt父对象。
@@ -38,17 +84,45 @@ class SpeedCalculationThread(QThread):
         self.roi_x, self.roi_y, self.roi_w, self.roi_h = roi_rect
         self.save_path_base = save_path
         self.time_limit = time_limit
+        self._frame_event = frame_event
         self._running = False
 
         # --- 线程状态变量 ---
-        self.crossing_timestamps = []   # 存储每个标记穿越参考线的时间戳列表
+        self.crossing_ts = np.empty(TOTAL_MARKERS, dtype=np.float64)  # 每个标记穿越参考线的时间戳（预分配）
+        self._n_ts = 0                  # crossing_ts 中已记录的时间戳个数
         self.expected_marker_index = 0  # 期望检测到的下一个标记的索引 (0=黑, 1=白1, ..., 11=白11)
         self.reference_line_y = self.roi_h // 2 # ROI内部的中心水平参考线 y坐标 (相对于ROI上边界)
         self.crossing_tolerance = 5     # 标记中心点靠近参考线的容差范围 (像素)   ！！！
+        # 只检测参考线上下 crossing_tolerance 行的窄带 (相对于ROI上边界)
+        self._band_y0 = max(0, self.reference_line_y - self.crossing_tolerance)
+        self._band_y1 = self.reference_line_y + self.crossing_tolerance + 1
+        self._marker_in_band = False    # 上一帧窄带内是否有标记（用于上升沿检测）
+        self._roi_bounds = None         # 缓存的ROI裁剪范围 (y0, y1, x0, x1)，ROI完全在帧外时为 None
+        self._roi_frame_shape = None    # 上述裁剪范围对应的帧尺寸 (h, w)
 
         # --- 图像处理参数 ---
         self.threshold_value = 200  # 二值化阈值
         self.min_contour_area = 1000  # 最小轮廓面积 (像素) ！！！
+        self.column_min_pixels = 2    # 窄带内某列白色像素数超过该值才认为该列被标记覆盖
+
+        # CPU 路径预分配的窄带缓冲区（灰度、二值、列投影），每帧复用；窄带尺寸变化时重新分配
+        self._alloc_band_buffers(self._band_y1 - self._band_y0, self.roi_w)
+
+        # numba 编译的单次遍历扫描（未安装 numba 时为 None）；启用 CUDA 时优先使用 CUDA
+        self._scan_kernel = _get_scan_kernel()
+
+        # --- CUDA 加速（OpenCV 编译了 CUDA 模块且有可用GPU时启用） ---
+        # 每帧只上传一次窄带，灰度化、二值化、按列求和都在GPU上完成，只下载一行列投影结果
+        try:
+            self._use_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except Exception:
+            self._use_cuda = False
+        if self._use_cuda:
+            self._g_src = cv2.cuda_GpuMat()
+            self._g_gray = cv2.cuda_GpuMat()
+            self._g_th = cv2.cuda_GpuMat()
+            self._g_sum = cv2.cuda_GpuMat()
+            self._stream = cv2.cuda.Stream()
 
         # --- 调试设置 ---
         self.debug_save_path = os.path.join(self.save_path_base, "speed_debug_refline")
@@ -58,6 +132,13 @@ class SpeedCalculationThread(QThread):
             print(f"[SpeedThreadRef] 创建调试目录失败: {e}")
             self.debug_save_path = None # 标记为不可用
 
+        # 调试图像的绘制和写盘在后台线程完成，检测循环只做非阻塞的入队
+        # 队列满时丢弃最旧的一项，磁盘速度不影响检测帧率
+        self._debug_q = None
+        if self.debug_save_path:
+            self._debug_q = queue.Queue(maxsize=8)
+            threading.Thread(target=self._debug_worker, daemon=True).start()
+
     def run(self):
         """线程执行的主体函数"""
         if not self.debug_save_path:
@@ -65,8 +146,9 @@ class SpeedCalculationThread(QThread):
              return
 
         self._running = True
-        self.crossing_timestamps = [] # 重置时间戳列表
+        self._n_ts = 0 # 重置时间戳计数
         self.expected_marker_index = 0 # 从第一条白线开始期待
+        self._marker_in_band = False
         self.status_update.emit(f"速度标定：等待第一条白线穿越中心线...")
         start_time = time.time()
         timeout_seconds = 30 # 稍微增加超时时间，因为需要检测更多标记，单位是秒
@@ -75,160 +157,256 @@ class SpeedCalculationThread(QThread):
             current_time = time.time()
             # 检查超时
             if current_time - start_time > timeout_seconds:
-                if not self.crossing_timestamps: # 如果一个标记都没检测到
+                if self._n_ts == 0: # 如果一个标记都没检测到
                      error_msg = f"错误：{timeout_seconds}秒内未检测到任何标记穿越"
                 else: # 检测到部分标记
-                     error_msg = f"错误：{timeout_seconds}秒超时，仅检测到 {len(self.crossing_timestamps)}/{TOTAL_MARKERS} 个标记"
+                     error_msg = f"错误：{timeout_seconds}秒超时，仅检测到 {self._n_ts}/{TOTAL_MARKERS} 个标记"
                 self.calculation_error.emit(error_msg)
                 self._running = False
                 break
 
-            # 1. 获取帧并执行基本检查
+            # 1. 等待新帧到达，获取帧并执行基本检查
+            self._wait_for_frame()
             frame = self.frame_source()
             if frame is None:
-                time.sleep(0.05)
                 continue
 
-            # 2. 裁剪ROI并检查有效性 (同前)
-            frame_h, frame_w = frame.shape[:2]
-            actual_roi_x = max(0, self.roi_x)
-            actual_roi_y = max(0, self.roi_y)
-            actual_roi_w = min(self.roi_w, frame_w - actual_roi_x)
-            actual_roi_h = min(self.roi_h, frame_h - actual_roi_y)
-            if actual_roi_w <= 0 or actual_roi_h <= 0:
-                 # 避免频繁发送警告，可能只在第一次或变化时发送
-                 time.sleep(0.1)
-                 continue
-            roi = frame[actual_roi_y : actual_roi_y + actual_roi_h, actual_roi_x : actual_roi_x + actual_roi_w]
-            if roi.size == 0:
-                time.sleep(0.1)
+            # 2. 裁剪ROI并检查有效性（裁剪范围只在帧尺寸变化时重新计算）
+            if frame.shape[:2] != self._roi_frame_shape:
+                self._update_roi_bounds(frame.shape[:2])
+            if self._roi_bounds is None:
                 continue
+            roi_y0, roi_y1, roi_x0, roi_x1 = self._roi_bounds
+            roi = frame[roi_y0:roi_y1, roi_x0:roi_x1]
 
-            # 3. 图像处理 (灰度化，二值化)
-            gray_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-            # 大于阈值的像素设置为白色，小于等于阈值的像素设置为黑色
-            _, thresh_roi = cv2.threshold(gray_roi, self.threshold_value, 255, cv2.THRESH_BINARY)
-
-            # 4. 查找轮廓
-            contours, _ = cv2.findContours(thresh_roi, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-            # 5. 检测是否有轮廓穿越参考线
-            for contour in contours:
-                if cv2.contourArea(contour) < self.min_contour_area:
-                    continue
-
-                # 计算轮廓中心点 (质心) 在ROI内的坐标
-                M = cv2.moments(contour)
-                if M["m00"] == 0: continue
-                #cx = int(M["m10"] / M["m00"])
-                cy = int(M["m01"] / M["m00"]) 
-
-                # --- 检查是否穿越或接近参考线 ---
-                # 如果轮廓中心点非常接近我们定义的中心参考线
-                if abs(cy - self.reference_line_y) <= self.crossing_tolerance:
-                    # 假设这个穿越的轮廓就是我们正在等待的那个标记
-                    crossing_time = time.time()
-
-                    # 记录时间戳
-                    self.crossing_timestamps.append(crossing_time)
-
-                    # 确定标记类型 (用于状态更新和调试)
-                    # marker_type = 'black' if self.expected_marker_index == 0 else f'white{self.expected_marker_index}'
-                    marker_type = f'white{self.expected_marker_index + 1}'
-                    self.status_update.emit(f"速度标定：检测到 '{marker_type}' 穿越中心线")
-
-                    # --- 计算速度 ---
-                    # 当我们有至少两个时间戳时，就可以计算速度
-                    if len(self.crossing_timestamps) >= 2:
-                        time_diff = self.crossing_timestamps[-1] - self.crossing_timestamps[-2]
-                        if time_diff > self.time_limit: # 避免除零或无效时间差
-                            # 更新状态，显示最新速度（可选，可能太频繁）
-                            # self.status_update.emit(f"实时速度: {current_speed:.3f} m/s")
-                            # 保存调试图像 (显示参考线和检测到的轮廓)
-                            self.save_debug_image(frame, thresh_roi, contour, marker_type, crossing_time)
-                        else:
-                            print(f"[SpeedThreadRef] 警告: 标记 '{marker_type}' 与前一个标记时间差过小 ({time_diff:.4f}s)")
-                            # 删除最后一个时间戳，因为它可能是无效的
-                            self.crossing_timestamps.pop()
-                            self.expected_marker_index -= 1 # 回退期待的标记索引
-
-                    # 准备期待下一个标记
-                    self.expected_marker_index += 1
-
-                    # 更新下一个期待的状态
-                    if self.expected_marker_index < TOTAL_MARKERS:
-                        #  next_marker_type = 'black' if self.expected_marker_index == 0 else f'white{self.expected_marker_index}'
-                         next_marker_type = f'white{self.expected_marker_index + 1}'
-                         self.status_update.emit(f"速度标定：等待 '{next_marker_type}' 穿越中心线...{self.expected_marker_index/TOTAL_MARKERS:.1%}")
+            # 3. 只处理参考线附近的窄带 (灰度化，二值化为 0/1)
+            band = roi[self._band_y0:self._band_y1]
+            if band.shape[0] == 0:
+                continue
+            band_h = band.shape[0]
+            # 4. 按列统计白色像素数，得到被标记覆盖的列数和范围
+            n_covered, x0, x1, thresh_band = self._scan_band(band)
+            # 被覆盖的列数 * 窄带高度 作为标记面积的近似值
+            marker_present = n_covered * band_h >= self.min_contour_area
+
+            # 5. 标记进入窄带的上升沿即为一次穿越（同一标记停留在窄带内的后续帧不再重复计数）
+            rising_edge = marker_present and not self._marker_in_band
+            self._marker_in_band = marker_present
+            if rising_edge:
+                marker_span = (x0, x1)
+                # 假设这个穿越的标记就是我们正在等待的那个标记
+                crossing_time = time.time()
+
+                # 记录时间戳
+                self.crossing_ts[self._n_ts] = crossing_time
+                self._n_ts += 1
+
+                # 确定标记类型 (用于状态更新和调试)
+                # marker_type = 'black' if self.expected_marker_index == 0 else f'white{self.expected_marker_index}'
+                marker_type = f'white{self.expected_marker_index + 1}'
+                self.status_update.emit(f"速度标定：检测到 '{marker_type}' 穿越中心线")
+
+                # --- 计算速度 ---
+                # 当我们有至少两个时间戳时，就可以计算速度
+                if self._n_ts >= 2:
+                    time_diff = self.crossing_ts[self._n_ts - 1] - self.crossing_ts[self._n_ts - 2]
+                    if time_diff > self.time_limit: # 避免除零或无效时间差
+                        # 更新状态，显示最新速度（可选，可能太频繁）
+                        # self.status_update.emit(f"实时速度: {current_speed:.3f} m/s")
+                        # 保存调试图像 (显示参考线和检测到的标记范围)
+                        # numba/CUDA 路径没有二值图，传入窄带副本，由保存线程在CPU上重新计算
+                        processed = thresh_band.copy() if thresh_band is not None else band.copy()
+                        self.save_debug_image(frame, processed, marker_span, marker_type, crossing_time)
                     else:
-                         self.status_update.emit(f"速度标定：所有 {TOTAL_MARKERS} 个标记已检测完毕。")
-                         self._running = False # 所有标记检测完成，结束线程
-
-                    # 优化：一旦找到一个符合条件的穿越轮廓，就处理并跳出本帧的轮廓查找
-                    # 假设同一帧内不会有多个标记同时精确穿越中心线
-                    break # 跳出 for contour 循环
+                        print(f"[SpeedThreadRef] 警告: 标记 '{marker_type}' 与前一个标记时间差过小 ({time_diff:.4f}s)")
+                        # 删除最后一个时间戳，因为它可能是无效的
+                        self._n_ts -= 1
+                        self.expected_marker_index -= 1 # 回退期待的标记索引
+
+                # 准备期待下一个标记
+                self.expected_marker_index += 1
+
+                # 更新下一个期待的状态
+                if self.expected_marker_index < TOTAL_MARKERS:
+                    #  next_marker_type = 'black' if self.expected_marker_index == 0 else f'white{self.expected_marker_index}'
+                     next_marker_type = f'white{self.expected_marker_index + 1}'
+                     self.status_update.emit(f"速度标定：等待 '{next_marker_type}' 穿越中心线...{self.expected_marker_index/TOTAL_MARKERS:.1%}")
+                else:
+                     self.status_update.emit(f"速度标定：所有 {TOTAL_MARKERS} 个标记已检测完毕。")
+                     self._running = False # 所有标记检测完成，结束线程
 
             # 检查是否因为检测完所有标记而停止
             if not self._running:
                 break # 跳出 while _running 循环
 
-            # 短暂暂停
-            time.sleep(0.01) # 可以适当调小延时，提高检测精度
-
         # 线程结束时的最终处理
         if self._running and self.expected_marker_index < TOTAL_MARKERS : # 如果是因为外部stop()调用而结束
              self.status_update.emit("速度标定(参考线法)已手动停止")
-        elif self.expected_marker_index == TOTAL_MARKERS and len(self.crossing_timestamps) >= 2:
+        elif self.expected_marker_index == TOTAL_MARKERS and self._n_ts >= 2:
              # 如果正常完成，可以额外发一个最终状态或平均速度（如果需要）
-             final_speed = MARKER_DISTANCE_M / (self.crossing_timestamps[-1] - self.crossing_timestamps[-2])
+             final_speed = MARKER_DISTANCE_M / (self.crossing_ts[self._n_ts - 1] - self.crossing_ts[self._n_ts - 2])
              self.status_update.emit(f"速度标定(参考线法)完成。最终速度段: {final_speed:.3f} m/s")
              # 若要计算平均速度：
-             if len(self.crossing_timestamps) == TOTAL_MARKERS :
-                speeds = [MARKER_DISTANCE_M / (self.crossing_timestamps[i] - self.crossing_timestamps[i-1])
-                          for i in range(1, len(self.crossing_timestamps))
-                          if (self.crossing_timestamps[i] - self.crossing_timestamps[i-1]) > 0.001]
-                if speeds:
-                    avg_speed = sum(speeds) / len(speeds)
+             if self._n_ts == TOTAL_MARKERS :
+                # 相邻标记的时间差，只保留大于 time_limit 的有效时间差（与检测时的判定一致）
+                diffs = np.diff(self.crossing_ts[:self._n_ts])
+                valid = diffs[diffs > self.time_limit]
+                if valid.size:
+                    # 平均速度 = 总距离 / 总时间；中位数对个别漏检/错位的标记更稳健
+                    avg_speed = MARKER_DISTANCE_M / valid.mean()
+                    median_speed = float(np.median(MARKER_DISTANCE_M / valid))
                     self.calculation_complete.emit(avg_speed) # 发送平均速度
-                    self.status_update.emit(f"标定完成。平均速度: {avg_speed:.3f} m/s")
-        elif not self.crossing_timestamps:
+                    self.status_update.emit(f"标定完成。平均速度: {avg_speed:.3f} m/s (中位数: {median_speed:.3f} m/s)")
+        elif self._n_ts == 0:
              # 如果是因为超时且未检测到任何标记而结束 (错误信息已在循环内发送)
              pass
 
         self._running = False # 确保最终状态为停止
+        if self._debug_q is not None:
+            self._debug_q.put(None)  # 通知保存线程写完剩余图像后退出
+
+
+    def _update_roi_bounds(self, frame_shape):
+        """按帧尺寸计算裁剪到帧范围内的ROI (y0, y1, x0, x1)"""
+        self._roi_frame_shape = frame_shape
+        frame_h, frame_w = frame_shape
+        x0 = max(0, self.roi_x)
+        y0 = max(0, self.roi_y)
+        x1 = min(self.roi_x + self.roi_w, frame_w)
+        y1 = min(self.roi_y + self.roi_h, frame_h)
+        self._roi_bounds = (y0, y1, x0, x1) if x1 > x0 and y1 > y0 else None
+
+    def _wait_for_frame(self):
+        """等待视频线程送来新帧（最多100ms，便于及时响应停止和超时）；没有帧事件时退回固定间隔轮询"""
+        if self._frame_event is None:
+            time.sleep(0.01)
+            return
+        self._frame_event.wait(0.1)
+        self._frame_event.clear()
+
+    def _scan_band(self, band):
+        """
+        统计窄带内被标记覆盖的列。
+        :return: (被覆盖的列数, 第一个被覆盖的列, 最后一个被覆盖的列, 二值图或 None)；
+                 numba 和 CUDA 路径不生成二值图，返回 None
+        """
+        if self._scan_kernel is not None and not self._use_cuda:
+            n_covered, x0, x1 = self._scan_kernel(band, self.threshold_value, self.column_min_pixels)
+            return n_covered, x0, x1, None
 
+        col_sum, thresh_band = self._band_column_sum(band)
+        cols = np.flatnonzero(col_sum > self.column_min_pixels)
+        if cols.size == 0:
+            return 0, -1, -1, thresh_band
+        return cols.size, int(cols[0]), int(cols[-1]), thresh_band
 
-    def save_debug_image(self, original_frame, processed_roi, contour, marker_type, timestamp):
-        """保存用于调试分析的图像，并绘制参考线。"""
-        if not self.debug_save_path: return # 如果路径无效则不保存
+    def _band_column_sum(self, band):
+        """
+        对窄带灰度化、二值化（大于阈值为1，否则为0）并按列求和。
+        :return: (列投影 int32 一维数组, 二值图或 None)；CUDA 路径不下载二值图，返回 None。
+                 CPU 路径返回的是预分配的缓冲区，下一帧会被覆盖，需要保留时应复制
+        """
+        if self._use_cuda:
+            try:
+                self._g_src.upload(np.ascontiguousarray(band), self._stream)
+                cv2.cuda.cvtColor(self._g_src, cv2.COLOR_BGR2GRAY, dst=self._g_gray, stream=self._stream)
+                cv2.cuda.threshold(self._g_gray, self.threshold_value, 1, cv2.THRESH_BINARY,
+                                   dst=self._g_th, stream=self._stream)
+                cv2.cuda.reduce(self._g_th, 0, cv2.REDUCE_SUM, vec=self._g_sum,
+                                dtype=cv2.CV_32S, stream=self._stream)
+                col_sum = self._g_sum.download(stream=self._stream)
+                self._stream.waitForCompletion()
+                return col_sum.ravel(), None
+            except (cv2.error, TypeError) as e:  # TypeError: 不同版本 cv2.cuda 绑定的参数不一致
+                print(f"[SpeedThreadRef] CUDA 处理失败，改用CPU: {e}")
+                self._use_cuda = False
+
+        if self._thresh_buf.shape != band.shape[:2]:
+            self._alloc_band_buffers(*band.shape[:2])
+        cv2.cvtColor(band, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+        cv2.threshold(self._gray_buf, self.threshold_value, 1, cv2.THRESH_BINARY, dst=self._thresh_buf)
+        self._thresh_buf.sum(axis=0, dtype=np.int32, out=self._col_buf)
+        return self._col_buf, self._thresh_buf
+
+    def _alloc_band_buffers(self, band_h, band_w):
+        """分配 band_h x band_w 的灰度、二值缓冲区和长度为 band_w 的列投影缓冲区"""
+        self._gray_buf = np.empty((band_h, band_w), dtype=np.uint8)
+        self._thresh_buf = np.empty((band_h, band_w), dtype=np.uint8)
+        self._col_buf = np.empty(band_w, dtype=np.int32)
+
+    def _threshold_band(self, band):
+        """CPU 上对窄带灰度化并二值化，大于阈值的像素为1（白色），小于等于阈值的像素为0（黑色）"""
+        gray_band = cv2.cvtColor(band, cv2.COLOR_BGR2GRAY)
+        _, thresh_band = cv2.threshold(gray_band, self.threshold_value, 1, cv2.THRESH_BINARY)
+        return thresh_band
+
+    def save_debug_image(self, original_frame, processed_band, marker_span, marker_type, timestamp):
+        """
+        将调试图像放入保存队列，由后台线程绘制并写盘；队列已满时丢弃最旧的一项。
+        只复制ROI及其周围半个ROI大小的区域（而不是整帧），processed_band 由保存线程直接绘制，调用方需传入独立的副本。
+        """
+        if self._debug_q is None: return # 如果路径无效则不保存
+
+        frame_h, frame_w = original_frame.shape[:2]
+        ctx_x0 = max(0, self.roi_x - self.roi_w // 2)
+        ctx_y0 = max(0, self.roi_y - self.roi_h // 2)
+        ctx_x1 = min(frame_w, self.roi_x + self.roi_w + self.roi_w // 2)
+        ctx_y1 = min(frame_h, self.roi_y + self.roi_h + self.roi_h // 2)
+        context = original_frame[ctx_y0:ctx_y1, ctx_x0:ctx_x1].copy()
+
+        item = (context, (ctx_x0, ctx_y0), processed_band, marker_span, marker_type, timestamp)
+        while True:
+            try:
+                self._debug_q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._debug_q.get_nowait()  # 静默丢弃最旧的一项（队列持续饱和时不刷屏）
+                except queue.Empty:
+                    pass
+
+    def _debug_worker(self):
+        """后台保存线程：依次取出队列中的调试图像，绘制后写入磁盘，收到 None 时退出"""
+        while True:
+            item = self._debug_q.get()
+            if item is None:
+                break
+            self._render_and_save_debug(*item)
 
+    def _render_and_save_debug(self, context, origin, processed_band, marker_span, marker_type, timestamp):
+        """
+        绘制并保存用于调试分析的图像，并绘制参考线。
+        :param context: 原始帧中ROI周围区域的副本（直接在其上绘制）
+        :param origin: context 左上角在原始帧中的坐标 (x, y)
+        :param processed_band: 参考线附近窄带的二值图 (0/1)；为彩色窄带时先在此处二值化
+        :param marker_span: 窄带内被标记覆盖的列范围 (x0, x1)，相对于ROI
+        """
         try:
-            # 1. 在原始帧副本上绘制ROI边界 (红色实线)
-            frame_copy = original_frame.copy()
-            frame_copy = cv2.cvtColor(frame_copy, cv2.COLOR_RGB2BGR)
+            if processed_band.ndim == 3:
+                processed_band = self._threshold_band(processed_band)
+
+            # 1. 在ROI周围区域的副本上绘制ROI边界 (红色实线)，坐标换算到该区域内
+            roi_x, roi_y = self.roi_x - origin[0], self.roi_y - origin[1]
             # ROI 边界
-            cv2.rectangle(frame_copy, (self.roi_x, self.roi_y),
-                          (self.roi_x + self.roi_w, self.roi_y + self.roi_h),
+            cv2.rectangle(context, (roi_x, roi_y),
+                          (roi_x + self.roi_w, roi_y + self.roi_h),
                           (0, 0, 255), 2) # 红色
-            # 参考线 (在ROI内部，相对于原始帧坐标)
-            ref_line_abs_y = self.roi_y + self.reference_line_y
-            cv2.line(frame_copy, (self.roi_x, ref_line_abs_y),
-                     (self.roi_x + self.roi_w, ref_line_abs_y),
+            # 参考线 (在ROI内部)
+            ref_line_y = roi_y + self.reference_line_y
+            cv2.line(context, (roi_x, ref_line_y),
+                     (roi_x + self.roi_w, ref_line_y),
                      (255, 0, 0), 1) # 蓝色细线
 
-            # 2. 在处理后的ROI副本上绘制参考线和检测到的轮廓
-            processed_roi_color = cv2.cvtColor(processed_roi, cv2.COLOR_GRAY2BGR)
-            # 参考线 (相对于ROI)
-            cv2.line(processed_roi_color, (0, self.reference_line_y),
-                     (self.roi_w, self.reference_line_y),
+            # 2. 在处理后的窄带副本上绘制参考线和检测到的标记范围
+            processed_roi_color = cv2.cvtColor(processed_band * 255, cv2.COLOR_GRAY2BGR)
+            # 参考线 (相对于窄带)
+            ref_y = self.reference_line_y - self._band_y0
+            cv2.line(processed_roi_color, (0, ref_y),
+                     (processed_roi_color.shape[1], ref_y),
                      (255, 0, 0), 1) # 蓝色细线
-            # 检测到的轮廓
-            cv2.drawContours(processed_roi_color, [contour], -1, (0, 255, 0), 2) # 绿色
-            # 轮廓中心点
-            M = cv2.moments(contour)
-            if M["m00"] != 0:
-                 center_point = (int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]))
-                 cv2.circle(processed_roi_color, center_point, 3, (0, 255, 0), -1)
+            # 检测到的标记范围 (绿色)
+            x0, x1 = marker_span
+            cv2.rectangle(processed_roi_color, (x0, 0), (x1, processed_roi_color.shape[0] - 1), (0, 255, 0), 1)
 
             # 3. 生成文件名
             ts_str = datetime.fromtimestamp(timestamp).strftime("%Y%m%d_%H%M%S_%f")[:-3]
@@ -236,7 +414,7 @@ class SpeedCalculationThread(QThread):
             filename_proc = os.path.join(self.debug_save_path, f"{ts_str}_{marker_type}_2.jpg")
 
             # 4. 保存图像
-            cv2.imwrite(filename_orig, frame_copy)
+            cv2.imwrite(filename_orig, context)
             cv2.imwrite(filename_proc, processed_roi_color)
 
         except Exception as e:
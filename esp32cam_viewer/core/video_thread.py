@@ -1,4 +1,5 @@
-import cv2, os, time
+import cv2, os, time, threading, queue
+import urllib.request
 import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal, QDateTime
 from PIL import ImageFont, ImageDraw, Image
@@ -8,12 +9,15 @@ class VideoStreamThread(QThread):
     视频流处理线程类（继承自QThread）
     功能：从IP摄像头获取视频流，支持实时显示和录制功能
     信号：
-    - frame_ready: 发送处理后的视频帧(numpy数组)
+    - frame_ready: 发送处理后的视频帧(numpy数组, BGR格式)
     - status_signal: 发送状态信息(状态类型, 消息内容)
+    其他线程可等待 frame_event（每到一帧置位一次），再读取 latest_frame 获取最新帧
     """
     frame_ready = pyqtSignal(np.ndarray)
     status_signal = pyqtSignal(str, str)  
 
+    _font_cache = {}  # 字体缓存 {(字体文件, 大小): ImageFont}，所有线程实例共享
+
     def __init__(self, ip=None, port=None, device=0):
         """
         初始化视频流线程
@@ -38,9 +42,21 @@ class VideoStreamThread(QThread):
         self._recording = False    # 录制状态标志
 
         # 视频录制相关属性
-        self.writer = None                  # 视频写入器对象
+        self.writer = None                  # 视频写入器对象（开始录制后收到第一帧时创建）
+        self._record_path = None            # 录制文件路径
+        self._record_fps = 6.0              # 录制帧率
+        self._rec_q = None                  # 待写入的录制帧队列（有界，写盘跟不上时丢帧而不阻塞视频线程）
+        self._rec_thread = None             # 录制写入线程
+        self._rec_lock = threading.Lock()   # 保护录制状态：视频线程创建/使用写入器与GUI线程停止录制互斥
         self.recording_start_time = 0       # 录制开始时间戳(毫秒)
         self.indicator_radius = 8          # 红点半径
+        self._text_cache = {}               # 文字贴图缓存 {(文字, 大小, 颜色): 贴图}
+        self._last_ts_sec = -1              # 上次格式化时间戳时的秒数
+        self._last_ts_str = ""              # 缓存的时间戳字符串
+
+        # 新帧通知：每处理完一帧先更新 latest_frame 再置位 frame_event，等待方无需轮询
+        self.latest_frame = None
+        self.frame_event = threading.Event()
 
         # 测试用属性（验证代码执行路径）
         self.test_frame_count = 0           # 测试：已处理帧数计数器
@@ -54,18 +70,49 @@ class VideoStreamThread(QThread):
         self._emit_status("debug", "视频流线程启动")
         self._fps_counter_start = time.time()  # 初始化FPS计时器
 
-        # 创建视频捕获对象
-        cap = cv2.VideoCapture(self.stream_url)
-        if not cap.isOpened():
-            self._emit_status("error", f"无法打开视频流 {self.stream_url}")
-            return
+        # 网络摄像头输出的是 MJPEG 流：直接解析 multipart 数据并用 cv2.imdecode 解码，
+        # 绕过 FFmpeg 的解复用和内部缓冲；打开失败（例如不是 MJPEG 流）时退回 VideoCapture
+        is_network = isinstance(self.stream_url, str)
+        stream = None
+        cap = None
+        if is_network:
+            try:
+                stream = self._open_mjpeg_stream(self.stream_url)
+            except (OSError, ValueError) as e:
+                self._emit_status("warning", f"无法直接读取MJPEG流，改用VideoCapture: {e}")
+
+        if stream is None:
+            # 创建视频捕获对象
+            cap = cv2.VideoCapture(self.stream_url)
+            if not cap.isOpened():
+                self._emit_status("error", f"无法打开视频流 {self.stream_url}")
+                return
+            # 后端内部缓冲只保留1帧，避免处理排队中的旧帧（部分后端不支持，忽略）
+            try:
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                if not is_network:
+                    # 本地USB摄像头请求 MJPG 格式：相同分辨率下带宽更小、可达到的帧率更高
+                    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            except Exception:
+                pass
 
         # 主循环
         while self._is_running:
             self.test_frame_count += 1
 
-            # 读取视频帧
-            ret, frame = cap.read()
+            if stream is not None:
+                try:
+                    frame = next(stream)
+                except StopIteration:
+                    self._emit_status("error", "视频流连接已断开")
+                    break
+                except (OSError, ValueError) as e:  # ValueError: 分段头部的 Content-Length 格式错误
+                    self._emit_status("error", f"视频流读取失败: {e}")
+                    break
+                ret = frame is not None
+            else:
+                # 读取视频帧（网络流先丢弃后端缓冲中的旧帧，只解码最新的一帧）
+                ret, frame = self._read_latest(cap) if is_network else cap.read()
             if not ret:
                 self._emit_status("warning", "视频帧获取失败")
                 continue
@@ -76,34 +123,83 @@ class VideoStreamThread(QThread):
             # 处理帧(添加时间戳、FPS显示和录制状态)
             processed_frame = self._process_frame(frame)
 
-            # 发送处理后的帧（BGR转RGB,QT显示需要RGB的）
-            self.frame_ready.emit(cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB))
+            # 发送处理后的帧（BGR格式，显示端直接使用 QImage.Format_BGR888，无需转换颜色）
+            self.frame_ready.emit(processed_frame)
+            self.latest_frame = processed_frame
+            self.frame_event.set()
 
         # 资源释放
-        cap.release()
-        if self.writer:
-            self.writer.release()
+        if stream is not None:
+            stream.close()
+        if cap is not None:
+            cap.release()
+        self._close_writer()
 
         self._emit_status("debug", "视频流线程停止")
 
     
-    def _add_timestamp(self, frame):
+    def _open_mjpeg_stream(self, url, timeout=5):
         """
-        添加时间戳到每一帧
-        :param frame: 原始视频帧
-        :return: 添加时间戳后的视频帧
+        打开 MJPEG (multipart/x-mixed-replace) 视频流
+        连接失败时直接抛出异常；连接成功后返回逐帧产出 BGR 图像的生成器（JPEG损坏的帧产出 None），
+        连接断开或线程停止时生成器结束。每个分段按 Content-Length 读取JPEG数据后交给 cv2.imdecode 解码。
         """
-        # 当前时间显示（左上角）
-        now = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss")
-        frame = self._draw_text_with_pil(
-            frame,
-            now,
-            position=(30, 30),  # 左上角
-            font_size=18,
-            color=(255, 255, 255)
-        )
-
-        return frame
+        resp = urllib.request.urlopen(url, timeout=timeout)
+
+        def frames():
+            try:
+                while self._is_running:
+                    # 读取分段头部（边界行、Content-Type、Content-Length），直到头部后的空行
+                    length = None
+                    while True:
+                        line = resp.readline()
+                        if not line:
+                            return  # 连接已关闭
+                        line = line.strip()
+                        if not line:
+                            if length is not None:
+                                break
+                            continue  # 上一帧数据后的空行
+                        name, _, value = line.partition(b":")
+                        if name.strip().lower() == b"content-length":
+                            length = int(value)
+
+                    data = resp.read(length)
+                    if len(data) < length:
+                        return  # 连接在帧中途断开
+                    yield cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            finally:
+                resp.close()
+
+        return frames()
+
+    def _read_latest(self, cap, max_drain=4, fresh_wait=0.005):
+        """
+        读取最新帧：grab() 很快返回（< fresh_wait 秒）说明取到的是缓冲中的旧帧，继续 grab 丢弃，
+        直到 grab 需要等待新帧为止（最多丢弃 max_drain 帧），最后只对保留的一帧 retrieve() 解码。
+        """
+        t = time.perf_counter()
+        ok = cap.grab()
+        for _ in range(max_drain):
+            if not ok or time.perf_counter() - t > fresh_wait:
+                break
+            t = time.perf_counter()
+            ok = cap.grab()
+        if not ok:
+            return False, None
+        return cap.retrieve()
+
+    def _timestamp_spec(self, frame):
+        """
+        时间戳文字（左上角）的绘制参数
+        :return: (文字, 位置, 字体大小, 颜色)
+        """
+        # 当前时间显示（左上角）；字符串每秒才变化一次，只在秒数变化时重新格式化
+        sec = QDateTime.currentMSecsSinceEpoch() // 1000
+        if sec != self._last_ts_sec:
+            self._last_ts_sec = sec
+            self._last_ts_str = QDateTime.fromMSecsSinceEpoch(sec * 1000).toString("yyyy-MM-dd HH:mm:ss")
+        return (self._last_ts_str, (30, 30), 18, (255, 255, 255))
 
     def _add_recording_indicator(self, frame):
         """
@@ -119,40 +215,83 @@ class VideoStreamThread(QThread):
         if elapsed_seconds % 2 == 0:
             cv2.circle(frame, (frame.shape[1] - 50, frame.shape[0] - 38), self.indicator_radius, (0, 0, 255), -1)
 
-        # 中文 & 英文文字使用PIL绘制（录制时长 + 时间戳）
-        frame = self._draw_text_with_pil(
-            frame,
-            f"已录制: {elapsed_seconds}s",
-            position=(frame.shape[1] - 200, frame.shape[0] - 50),  # 右下角
-            font_size=24,
-            color=(255, 255, 255)
-        )
-
+        # 中文 & 英文文字使用PIL绘制（录制时长，右下角）
+        return self._draw_texts(frame, [
+            (f"已录制: {elapsed_seconds}s", (frame.shape[1] - 200, frame.shape[0] - 50), 24, (255, 255, 255)),
+        ])
+
+    def _get_font(self, font_size):
+        """获取指定大小的字体（按 (字体文件, 大小) 缓存，避免每帧重新加载字体文件）"""
+        key = ("simhei.ttf", font_size)
+        font = VideoStreamThread._font_cache.get(key)
+        if font is None:
+            try:
+                font = ImageFont.truetype("simhei.ttf", font_size)  # 中文黑体
+            except:
+                font = ImageFont.load_default()
+            VideoStreamThread._font_cache[key] = font
+        return font
+
+    def _get_text_sprite(self, text, font_size, color):
+        """
+        获取文字的预渲染贴图（按 (文字, 大小, 颜色) 缓存）
+        :return: (dx, dy, alpha, color_alpha)，dx/dy 为贴图相对绘制位置的偏移，
+                 alpha 为 HxWx1 的透明度(0~255)，color_alpha 为 颜色*透明度，均为 uint16 便于混合
+        """
+        key = (text, font_size, color)
+        sprite = self._text_cache.get(key)
+        if sprite is None:
+            font = self._get_font(font_size)
+            left, top, right, bottom = font.getbbox(text)
+            left, top = max(0, left), max(0, top)
+            mask = Image.new("L", (max(1, right), max(1, bottom)), 0)
+            ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+            alpha = np.asarray(mask, dtype=np.uint16)[top:bottom, left:right, None]
+            color_alpha = alpha * np.array(color, dtype=np.uint16)
+            sprite = (left, top, alpha, color_alpha)
+            # 时间戳、FPS等文字每秒变化一次，缓存过多时清空
+            if len(self._text_cache) >= 64:
+                self._text_cache.clear()
+            self._text_cache[key] = sprite
+        return sprite
+
+    def _draw_texts(self, frame, specs):
+        """
+        一次绘制多段文字
+        :param frame: OpenCV图像帧 (BGR)，直接在其上绘制
+        :param specs: [(文字, 位置(x, y), 字体大小, 颜色(B, G, R)), ...]
+        """
+        for text, position, font_size, color in specs:
+            self._draw_text_with_pil(frame, text, position, font_size, color)
         return frame
 
     def _draw_text_with_pil(self, frame, text, position=(50, 50), font_size=24, color=(255, 255, 255)):
         """
         使用PIL绘制支持中文的文字
-        :param frame: OpenCV图像帧 (BGR)
+        文字只用PIL渲染一次成透明度贴图并缓存，之后直接在BGR帧的对应区域内做alpha混合，
+        不再对整帧做 BGR<->RGB 转换和 PIL 图像的往返拷贝。
+        :param frame: OpenCV图像帧 (BGR)，直接在其上绘制
         :param text: 显示文字（支持中文）
         :param position: 显示位置(x, y)
         :param font_size: 字体大小
         :param color: 字体颜色 (B, G, R)
         """
-        # OpenCV图像转PIL格式
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_img = Image.fromarray(image)
-
-        draw = ImageDraw.Draw(pil_img)
-        try:
-            font = ImageFont.truetype("simhei.ttf", font_size)  # 中文黑体
-        except:
-            font = ImageFont.load_default()
-
-        draw.text(position, text, font=font, fill=color[::-1])  # RGB顺序
-
-        # PIL图像转回OpenCV格式
-        frame = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+        dx, dy, alpha, color_alpha = self._get_text_sprite(text, font_size, tuple(color))
+        x0, y0 = position[0] + dx, position[1] + dy
+        h, w = alpha.shape[:2]
+
+        # 裁剪到帧范围内
+        fx0, fy0 = max(0, x0), max(0, y0)
+        fx1, fy1 = min(frame.shape[1], x0 + w), min(frame.shape[0], y0 + h)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return frame
+        sx0, sy0 = fx0 - x0, fy0 - y0
+        sx1, sy1 = sx0 + (fx1 - fx0), sy0 + (fy1 - fy0)
+
+        region = frame[fy0:fy1, fx0:fx1]
+        a = alpha[sy0:sy1, sx0:sx1]
+        # 按透明度混合：(背景 * (255 - a) + 颜色 * a) / 255
+        region[:] = (region * (255 - a) + color_alpha[sy0:sy1, sx0:sx1]) // 255
         return frame
 
     def _emit_status(self, status_type, message):
@@ -165,9 +304,22 @@ class VideoStreamThread(QThread):
         self.status_signal.emit(status_type, message)
 
     def _get_video_writer(self, filepath, fps, frame_size):
-        """创建合适的VideoWriter"""
-        fourcc = self._get_fourcc(filepath)
-        return cv2.VideoWriter(filepath, fourcc, fps, frame_size)
+        """
+        创建合适的VideoWriter
+        .avi 容器优先使用 MJPG 编码（逐帧JPEG，libjpeg-turbo 编码开销远小于 XVID/mp4v），无法打开时退回 XVID；
+        其他容器（如 .mp4）直接按扩展名选择编码：FFmpeg 会把 MJPG 静默改存为 mp4v 标签的非标准文件，很多播放器无法播放
+        """
+        fourccs = [self._get_fourcc(filepath)]
+        if os.path.splitext(filepath)[1].lower() == '.avi':
+            fourccs.insert(0, cv2.VideoWriter_fourcc(*'MJPG'))
+        writer = None
+        for fourcc in fourccs:
+            if writer is not None:
+                writer.release()
+            writer = cv2.VideoWriter(filepath, fourcc, fps, frame_size)
+            if writer.isOpened():
+                break
+        return writer
 
     def _get_fourcc(self, filepath):
         ext = os.path.splitext(filepath)[1].lower()
@@ -191,55 +343,104 @@ class VideoStreamThread(QThread):
 
     def _process_frame(self, frame):
         """帧处理函数 - 添加FPS显示"""
-        # 添加时间戳
-        frame = self._add_timestamp(frame)
-        
-        # 添加FPS显示
-        frame = self._add_fps_display(frame)
-        
-        # 录制状态处理
+        # 时间戳和FPS一次绘制完成
+        frame = self._draw_texts(frame, [self._timestamp_spec(frame), self._fps_spec(frame)])
+
+        # 录制状态处理（录制的视频中不含录制指示器）
         if self._recording:
-            if self.writer:
-                self.writer.write(frame)
-            frame = self._add_recording_indicator(frame)
-            
+            with self._rec_lock:
+                # 锁内再次检查：GUI线程可能刚刚停止录制，此时不能再创建写入器（会截断刚保存的文件）
+                if self._recording and self.writer is None:
+                    self._open_writer(frame)
+                rec_q = self._rec_q
+                if rec_q is not None:
+                    # 交给录制线程写盘；录制指示器会直接画在 frame 上，因此放入队列的是副本
+                    # 在锁内放入，保证不会排在结束标记 None 之后
+                    try:
+                        rec_q.put_nowait(frame.copy())
+                    except queue.Full:
+                        pass  # 磁盘写入跟不上时丢弃该帧，而不是阻塞视频线程
+            if rec_q is not None:
+                frame = self._add_recording_indicator(frame)
+
         return frame
 
-    def _add_fps_display(self, frame):
-        """在右上角添加FPS显示"""
+    def _open_writer(self, frame):
+        """按当前帧的分辨率创建视频写入器，失败时停止录制（调用方需持有 _rec_lock）"""
+        h, w = frame.shape[:2]
+        writer = self._get_video_writer(self._record_path, self._record_fps, (w, h))
+        if not writer.isOpened():
+            writer.release()
+            self._recording = False
+            self._discard_empty_file(self._record_path)
+            self._emit_status("error", "无法创建视频文件")
+            return
+        self.writer = writer
+        self._rec_q = queue.Queue(maxsize=4)
+        self._rec_thread = threading.Thread(target=self._record_loop, args=(writer, self._rec_q), daemon=True)
+        self._rec_thread.start()
+
+    @staticmethod
+    def _record_loop(writer, rec_q):
+        """录制线程：从队列取帧写入视频文件，收到 None 时释放写入器并退出"""
+        while True:
+            frame = rec_q.get()
+            if frame is None:
+                break
+            writer.write(frame)
+        writer.release()
+
+    def _close_writer(self):
+        """
+        结束录制并关闭写入：等待队列中的帧写完并释放写入器；没有打开的写入器时返回 False
+        可在任意线程调用；结束录制和取出写入器在同一把锁内完成，视频线程不会再重新创建写入器
+        """
+        with self._rec_lock:
+            self._recording = False
+            rec_q, rec_thread = self._rec_q, self._rec_thread
+            self._rec_q = None
+            self._rec_thread = None
+            self.writer = None
+            if rec_q is None:
+                # 还没收到帧就停止录制：删除开始录制时预留的空文件
+                self._discard_empty_file(self._record_path)
+                return False
+            rec_q.put(None)
+        rec_thread.join()
+        return True
+
+    @staticmethod
+    def _discard_empty_file(path):
+        """删除预留但没有写入任何数据的录制文件（文件名在开始录制时以空文件占用）"""
+        try:
+            if path and os.path.getsize(path) == 0:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def _fps_spec(self, frame):
+        """FPS文字（右上角，绿色）的绘制参数"""
         fps_text = f"FPS: {self._current_fps:.1f}"
-        frame = self._draw_text_with_pil(
-            frame,
-            fps_text,
-            position=(frame.shape[1] - 150, 30),  # 右上角位置
-            font_size=18,
-            color=(0, 255, 0)  # 绿色文字
-        )
-        return frame
+        return (fps_text, (frame.shape[1] - 150, 30), 18, (0, 255, 0))
 
     # ---------- 公共控制接口 ----------
     def start_recording(self, filepath, FPS=6.0):
         """
         开始录制视频
+        视频写入器在收到下一帧时按该帧的实际分辨率创建（分辨率不符的帧会被 VideoWriter 静默丢弃）
         :param FPS: 录制帧率
         :param filepath: 视频保存路径（建议.avi格式）
         """
-        # 初始化视频写入器（合适的编码，6fps，640x480分辨率） ！！！注意分辨率
-        self.writer = self._get_video_writer(filepath, FPS, (640, 480))
-        if not self.writer.isOpened():
-            self._emit_status("error", "无法创建视频文件")
-            return
-
-        self._recording = True
+        with self._rec_lock:
+            self._record_path = filepath
+            self._record_fps = FPS
+            self._recording = True
         self.recording_start_time = QDateTime.currentMSecsSinceEpoch()
         self._emit_status("info", "视频录制已开始")
 
     def stop_recording(self):
         """停止视频录制"""
-        self._recording = False
-        if self.writer:
-            self.writer.release()
-            self.writer = None
+        if self._close_writer():
             self._emit_status("info", "视频录制已停止")
 
     def stop(self):
@@ -1,4 +1,5 @@
 # 导入必要的库
+import os  # 路径处理，用于生成导出文件名
 import sys  # 系统相关，用于退出程序
 import cv2  # OpenCV库，用于图像处理
 import numpy as np  # NumPy库，用于高效处理数组（图像）
@@ -9,6 +10,66 @@ from PyQt5.QtWidgets import (  # PyQt5 GUI组件
 from PyQt5.QtGui import QImage, QPixmap  # PyQt5图像处理相关
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer # PyQt5核心功能，如信号、定时器、对齐等
 
+# 启用 OpenCV 的 SIMD 优化路径（inRange、bitwise_and 等按 AVX2/NEON 等指令集分派）
+cv2.setUseOptimized(True)
+
+
+def print_cpu_features():
+    """输出当前 OpenCV 编译时启用的 CPU 指令集（CPU_BASELINE / CPU_DISPATCH），用于确认 SIMD 加速是否可用"""
+    for line in cv2.getBuildInformation().splitlines():
+        line = line.strip()
+        if line.startswith(("Baseline:", "Dispatched code:", "CPU_BASELINE", "CPU_DISPATCH")):
+            print(f"OpenCV {line}")
+    print(f"OpenCV 优化已启用: {cv2.useOptimized()}")
+
+
+def _init_opencl():
+    """检测 OpenCL（T-API）是否可用：可用时 inRange、bitwise_and 可通过 cv2.UMat 在 GPU（如核显）上执行"""
+    try:
+        if not cv2.ocl.haveOpenCL():
+            return False
+        cv2.ocl.setUseOpenCL(True)
+        return cv2.ocl.useOpenCL()
+    except (AttributeError, cv2.error) as e:
+        print(f"OpenCL 初始化失败，使用 CPU 处理: {e}")
+        return False
+
+
+_USE_OPENCL = _init_opencl()
+
+# 可选：numba 即时编译的融合内核，一次遍历同时完成 inRange 和 bitwise_and；未安装时使用 OpenCV
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def hsv_mask_apply(bgr, hsv, lut_h, lut_s, lut_v, mask, out):
+        """
+        按查找表判断 HSV 是否在范围内（查找表中范围内为 255，否则为 0）：
+        mask = lut_h[h] & lut_s[s] & lut_v[v]，out = bgr & mask，无分支
+        """
+        for y in prange(hsv.shape[0]):
+            for x in range(hsv.shape[1]):
+                m = lut_h[hsv[y, x, 0]] & lut_s[hsv[y, x, 1]] & lut_v[hsv[y, x, 2]]
+                mask[y, x] = m
+                out[y, x, 0] = bgr[y, x, 0] & m
+                out[y, x, 1] = bgr[y, x, 1] & m
+                out[y, x, 2] = bgr[y, x, 2] & m
+
+    # 启动时用小图预热一次，把编译开销放在打开窗口之前，而不是第一次拖动滑块时
+    _warm = np.zeros((2, 2, 3), dtype=np.uint8)
+    _warm_lut = np.zeros(256, dtype=np.uint8)
+    hsv_mask_apply(_warm, _warm, _warm_lut, _warm_lut, _warm_lut,
+                   np.zeros((2, 2), np.uint8), np.zeros_like(_warm))
+    del _warm, _warm_lut
+else:
+    hsv_mask_apply = None
+
+# Qt >= 5.14 支持 BGR888 格式，可直接使用 OpenCV 的 BGR 数据，无需转换颜色；旧版本 Qt 为 None
+_FORMAT_BGR888 = getattr(QImage, "Format_BGR888", None)
+
 # --- 辅助函数：将OpenCV图像 (numpy array) 转换为 PyQt 可显示的 QPixmap ---
 def convert_cv_qt(cv_img, width=None, height=None):
     """
@@ -20,41 +81,55 @@ def convert_cv_qt(cv_img, width=None, height=None):
     """
     if cv_img is None:
         return QPixmap() # 如果图像为空，返回空Pixmap
+    if len(cv_img.shape) not in (2, 3):
+        print("不支持的图像格式") # 控制台输出错误信息
+        return QPixmap() # 不支持的格式，返回空Pixmap
+
+    # 如果提供了目标尺寸，先用 OpenCV 缩放（保持纵横比），只把缩放后的小图交给 Qt
+    h, w = cv_img.shape[:2]
+    if width or height:
+        scale = min(width / w if width else float("inf"), height / h if height else float("inf"))
+        nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
+        if (nw, nh) != (w, h):
+            # 缩小用 INTER_AREA，放大用双线性，与原先 Qt.SmoothTransformation 的效果相近
+            interp = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            cv_img = cv2.resize(cv_img, (nw, nh), dst=_get_resize_buffer(nh, nw, cv_img.shape[2:]),
+                                interpolation=interp)
+            h, w = nh, nw
 
     # 检查图像维度并进行颜色空间转换
     if len(cv_img.shape) == 3: # 彩色图像 (通常是 BGR)
-        # OpenCV 默认 BGR，Qt 需要 RGB
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape  # 获取高度、宽度、通道数
-        bytes_per_line = ch * w     # 每行的字节数
-        # 创建 QImage 对象
-        convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-    elif len(cv_img.shape) == 2: # 灰度图像 (例如掩码)
-        h, w = cv_img.shape         # 获取高度、宽度
-        bytes_per_line = w          # 每行的字节数
+        if _FORMAT_BGR888 is not None:
+            # 直接引用 BGR 数据创建 QImage（不复制）；cv_img 在下面生成 QPixmap 之前一直有效
+            convert_to_Qt_format = QImage(cv_img.data, w, h, cv_img.strides[0], _FORMAT_BGR888)
+        else:
+            # 旧版本 Qt：OpenCV 默认 BGR，Qt 需要 RGB
+            rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
+            bytes_per_line = 3 * w      # 每行的字节数
+            # 创建 QImage 对象
+            convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
+    else: # 灰度图像 (例如掩码)
         # 创建 QImage 对象 (灰度)
-        convert_to_Qt_format = QImage(cv_img.data, w, h, bytes_per_line, QImage.Format_Grayscale8)
+        convert_to_Qt_format = QImage(cv_img.data, w, h, cv_img.strides[0], QImage.Format_Grayscale8)
         # 注意：如果想显示应用掩码后的彩色结果，应先用cv2.bitwise_and处理，然后转换那个结果（它会是BGR格式）
-    else:
-        print("不支持的图像格式") # 控制台输出错误信息
-        return QPixmap() # 不支持的格式，返回空Pixmap
 
-    # 如果提供了目标尺寸，则进行缩放
-    if width and height:
-        # 按指定宽高缩放，保持纵横比，平滑变换
-        p = convert_to_Qt_format.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    elif width:
-        # 按指定宽度缩放，保持纵横比，平滑变换
-         p = convert_to_Qt_format.scaledToWidth(width, Qt.SmoothTransformation)
-    elif height:
-        # 按指定高度缩放，保持纵横比，平滑变换
-        p = convert_to_Qt_format.scaledToHeight(height, Qt.SmoothTransformation)
-    else:
-        # 不进行缩放
-        p = convert_to_Qt_format
-
-    # 从 QImage 创建 QPixmap 并返回
-    return QPixmap.fromImage(p)
+    # 从 QImage 创建 QPixmap（复制像素数据）并返回
+    return QPixmap.fromImage(convert_to_Qt_format)
+
+
+# 缩放输出缓冲区，按 (高, 宽, 通道) 复用；QPixmap.fromImage 会复制数据，因此下次调用可以安全覆盖
+_resize_buffers = {}
+
+
+def _get_resize_buffer(h, w, channels):
+    """取得 (h, w) + channels 形状的 uint8 缓冲区"""
+    key = (h, w) + tuple(channels)
+    buf = _resize_buffers.get(key)
+    if buf is None:
+        if len(_resize_buffers) >= 8:  # 尺寸频繁变化时避免无限增长
+            _resize_buffers.clear()
+        buf = _resize_buffers[key] = np.empty(key, dtype=np.uint8)
+    return buf
 
 # --- 主应用窗口类 ---
 class ImageProcessorApp(QWidget):
@@ -64,12 +139,28 @@ class ImageProcessorApp(QWidget):
     def __init__(self):
         super().__init__()
         self.original_frame = None # 存储原始加载的 BGR 图像
-        self.hsv_frame = None      # 存储转换后的 HSV 图像
+        self.hsv_frame = None      # 原始分辨率的 HSV 图像，只在需要原始分辨率结果时才生成
+        self.original_small = None # 缩放到显示宽度的 BGR 图像（滑块调节时只处理它）
+        self.original_pixmap = None # 原始图像的显示用 QPixmap，每次加载只生成一次
+        self.hsv_small = None      # 缩放到显示宽度的 HSV 图像
+        self.original_umat = None  # original_small 的 UMat 副本（仅 OpenCL 可用时）
+        self.hsv_umat = None       # hsv_small 的 UMat 副本（仅 OpenCL 可用时）
         self.current_mask = None   # 存储当前计算出的 HSV 掩码 (黑白图)
         self.masked_result = None  # 存储应用掩码后的原始彩色图像区域
         self.is_hsv_mode = False   # 标记当前是否处于 HSV 处理模式
         self.display_width = 400   # 图像显示区域的最大宽度 (像素)
 
+        # 复用的阈值数组和输出缓冲区，拖动滑块时不再每次新建数组
+        self._lower = np.zeros(3, dtype=np.uint8)  # HSV 下界 [H, S, V]
+        self._upper = np.zeros(3, dtype=np.uint8)  # HSV 上界 [H, S, V]
+        # numba 内核使用的查找表（范围内为 255，否则为 0），只在阈值变化时重建
+        self._lut_h = np.zeros(256, dtype=np.uint8)
+        self._lut_s = np.zeros(256, dtype=np.uint8)
+        self._lut_v = np.zeros(256, dtype=np.uint8)
+        self._lut_bounds = None                    # 查找表对应的 (下界, 上界)
+        self._mask_out = None                      # 掩码缓冲区，图像尺寸变化时重新分配
+        self._masked_out = None                    # 掩码结果缓冲区
+
         # --- HSV 阈值默认值 ---
         # (这些值大致对应你之前代码计算得出的范围，注意OpenCV的H范围是0-179)
         self.h_min_val = 27
@@ -79,12 +170,15 @@ class ImageProcessorApp(QWidget):
         self.v_min_val = 152 # 约 162.1 - 9.8 = 152.3
         self.v_max_val = 171 # 约 162.1 + 9.8 = 171.9
 
+        # 用于缓冲滑块更新的定时器（一次性，只创建一次，重复 start 即重新计时）
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self.trigger_update)
+
         # 初始化用户界面
         self.initUI()
         # 连接自定义信号到更新槽函数
         self.updateNeeded.connect(self.apply_hsv_filter_and_update_display)
-        # 用于缓冲滑块更新的定时器
-        self.update_timer = None
 
     # --- 初始化用户界面 ---
     def initUI(self):
@@ -105,11 +199,15 @@ class ImageProcessorApp(QWidget):
         self.btn_reset = QPushButton('复位') # 创建按钮
         self.btn_reset.clicked.connect(self.reset_all) # 连接点击信号到槽函数
         self.btn_reset.setEnabled(False) # 初始时禁用，直到加载图片
+        self.btn_export = QPushButton('导出掩码') # 创建按钮：按原始分辨率导出掩码和结果
+        self.btn_export.clicked.connect(self.export_mask) # 连接点击信号到槽函数
+        self.btn_export.setEnabled(False) # 初始时禁用，只在 HSV 模式下可用
 
         # 将按钮添加到按钮布局中
         button_layout.addWidget(self.btn_load)
         button_layout.addWidget(self.btn_hsv_mode)
         button_layout.addWidget(self.btn_reset)
+        button_layout.addWidget(self.btn_export)
         button_layout.addStretch(1) # 添加伸缩因子，将按钮推到左侧
         main_layout.addLayout(button_layout) # 将按钮布局添加到主布局
 
@@ -146,6 +244,7 @@ class ImageProcessorApp(QWidget):
 
         self.sliders = {} # 字典存储滑块控件
         self.slider_labels = {} # 字典存储滑块对应的标签控件
+        self.display_names = {} # 字典存储滑块内部名称对应的中文显示名称
 
         row = 0 # 网格布局的行计数器
         for display_name, internal_name, min_val, max_val, initial_val in slider_params:
@@ -162,6 +261,7 @@ class ImageProcessorApp(QWidget):
             # 存储滑块和标签
             self.sliders[internal_name] = slider
             self.slider_labels[internal_name] = label
+            self.display_names[internal_name] = display_name
 
             # 将标签和滑块添加到网格布局
             hsv_layout.addWidget(self.slider_labels[internal_name], row, 0) # 第 row 行，第 0 列
@@ -187,8 +287,19 @@ class ImageProcessorApp(QWidget):
             self.original_frame = cv2.imread(file_path)
             if self.original_frame is not None: # 检查是否成功加载
                 print(f"图片已加载: {file_path}, 尺寸: {self.original_frame.shape}") # 控制台输出中文信息
-                # 将 BGR 图像转换为 HSV 图像，只转换一次，存储起来
-                self.hsv_frame = cv2.cvtColor(self.original_frame, cv2.COLOR_BGR2HSV)
+                # 原始分辨率的 HSV 图像改为按需生成，平时只保留显示尺寸的 HSV 图像
+                self.hsv_frame = None
+                # 预先缩放到显示宽度：滑块调节时只对小图做阈值处理，显示时也无需再缩放
+                h, w = self.original_frame.shape[:2]
+                disp_w = self.display_width
+                disp_h = max(1, round(h * disp_w / w))
+                interp = cv2.INTER_AREA if disp_w < w else cv2.INTER_LINEAR
+                self.original_small = cv2.resize(self.original_frame, (disp_w, disp_h), interpolation=interp)
+                self.hsv_small = cv2.cvtColor(self.original_small, cv2.COLOR_BGR2HSV)
+                # 原始图像不随滑块变化，显示用的 QPixmap 只生成一次
+                self.original_pixmap = convert_cv_qt(self.original_small)
+                # OpenCL 可用时把图像上传到 GPU 一次，之后滑块调节只在 GPU 上做阈值处理
+                self._upload_umats()
                 self.reset_all() # 加载新图后，重置UI状态（但不清除图像）
                 self.apply_hsv_filter_and_update_display() # 更新界面显示加载的图片
                 # 启用 HSV 模式按钮和复位按钮
@@ -200,6 +311,11 @@ class ImageProcessorApp(QWidget):
                 self.original_display_label.setText("加载图片错误") # 在标签上显示错误
                 self.original_frame = None
                 self.hsv_frame = None
+                self.original_small = None
+                self.original_pixmap = None
+                self.hsv_small = None
+                self.original_umat = None
+                self.hsv_umat = None
                 # 禁用相关按钮
                 self.btn_hsv_mode.setEnabled(False)
                 self.btn_hsv_mode.setChecked(False) # 确保按钮状态也复位
@@ -210,6 +326,7 @@ class ImageProcessorApp(QWidget):
         """当 HSV 模式按钮状态改变时调用"""
         self.is_hsv_mode = checked # 更新模式标志
         self.hsv_groupbox.setEnabled(checked) # 启用/禁用 HSV 滑块组
+        self.btn_export.setEnabled(checked) # 只有 HSV 模式下才能导出掩码
 
         if checked: # 如果进入 HSV 模式
             self.btn_hsv_mode.setText("禁用 HSV 模式") # 更新按钮文本
@@ -255,17 +372,7 @@ class ImageProcessorApp(QWidget):
 
         # 注意：这里不再直接调用 apply_hsv_filter，而是启动定时器
         # --- 使用定时器进行防抖 (Debounce) 处理 ---
-        # 如果定时器已存在并且正在运行，则停止并重新启动它
-        if self.update_timer:
-            self.update_timer.stop()
-        else:
-            # 如果定时器不存在，创建一个一次性定时器
-            self.update_timer = QTimer()
-            self.update_timer.setSingleShot(True) # 只触发一次
-            # 定时器超时后，连接到触发更新的槽函数
-            self.update_timer.timeout.connect(self.trigger_update)
-
-        # 启动/重启定时器，延迟 50 毫秒
+        # 启动/重启定时器（定时器正在运行时 start 会重新开始计时），延迟 50 毫秒
         # 这意味着只有在滑块停止移动 50ms 后，才会真正执行图像处理
         self.update_timer.start(50)
 
@@ -274,7 +381,6 @@ class ImageProcessorApp(QWidget):
         """定时器超时后调用的槽函数，实际执行图像处理和显示更新"""
         if self.is_hsv_mode: # 仅在 HSV 模式下处理
             self.apply_hsv_filter_and_update_display()
-        self.update_timer = None # 处理完毕，重置定时器标志
 
     # --- 应用 HSV 滤波并更新显示 (合并原 apply_hsv_filter 和 update_display 的部分逻辑) ---
     def apply_hsv_filter_and_update_display(self):
@@ -289,12 +395,11 @@ class ImageProcessorApp(QWidget):
             self.processed_display_label.setText('处理后的图像将显示在此处')
             return
 
-        # 总是更新原始图像的显示
-        qt_original_pixmap = convert_cv_qt(self.original_frame, width=self.display_width)
-        self.original_display_label.setPixmap(qt_original_pixmap)
+        # 总是更新原始图像的显示（使用加载时生成的 QPixmap）
+        self.original_display_label.setPixmap(self.original_pixmap)
 
         # --- 如果处于 HSV 模式，则进行处理并更新右侧显示 ---
-        if self.is_hsv_mode and self.hsv_frame is not None:
+        if self.is_hsv_mode and self.hsv_small is not None:
             # 从滑块获取当前的 HSV 阈值
             h_min = self.sliders["H Min"].value()
             h_max = self.sliders["H Max"].value()
@@ -303,21 +408,51 @@ class ImageProcessorApp(QWidget):
             v_min = self.sliders["V Min"].value()
             v_max = self.sliders["V Max"].value()
 
-            # 创建 NumPy 数组表示颜色范围下界和上界
-            lower_bound = np.array([h_min, s_min, v_min])
-            upper_bound = np.array([h_max, s_max, v_max])
-
-            # 使用 cv2.inRange 创建二值掩码
-            # 在 hsv_frame 中，像素值在 [lower_bound, upper_bound] 区间内的为白色(255)，否则为黑色(0)
-            self.current_mask = cv2.inRange(self.hsv_frame, lower_bound, upper_bound)
-
-            # 使用掩码和按位与操作，从原始 BGR 图像中提取颜色在范围内的区域
-            # 掩码为白色的地方，保留原始图像像素；掩码为黑色的地方，结果为黑色
-            self.masked_result = cv2.bitwise_and(self.original_frame, self.original_frame, mask=self.current_mask)
+            # 将颜色范围下界和上界写入复用的数组
+            self._lower[0], self._lower[1], self._lower[2] = h_min, s_min, v_min
+            self._upper[0], self._upper[1], self._upper[2] = h_max, s_max, v_max
+
+            # 输出缓冲区按图像尺寸分配一次，之后复用
+            if self._mask_out is None or self._mask_out.shape != self.hsv_small.shape[:2]:
+                self._mask_out = np.empty(self.hsv_small.shape[:2], dtype=np.uint8)
+                self._masked_out = np.empty_like(self.original_small)
+
+            if hsv_mask_apply is not None:
+                # numba 融合内核：一次遍历同时生成掩码和掩码结果
+                self._update_luts()
+                hsv_mask_apply(self.original_small, self.hsv_small, self._lut_h, self._lut_s, self._lut_v,
+                               self._mask_out, self._masked_out)
+                self.current_mask = self._mask_out
+                self.masked_result = self._masked_out
+            elif self.hsv_umat is not None:
+                # OpenCL（T-API）：inRange 和 bitwise_and 在 GPU 上执行，只把最终结果下载回来用于显示
+                try:
+                    mask_umat = cv2.inRange(self.hsv_umat, self._lower, self._upper)
+                    result_umat = cv2.bitwise_and(self.original_umat, self.original_umat, mask=mask_umat)
+                    self.current_mask = mask_umat.get()
+                    self.masked_result = result_umat.get()
+                except cv2.error as e:
+                    # OpenCL 运行失败时退回 CPU 处理，之后不再尝试
+                    print(f"OpenCL 处理失败，改用 CPU: {e}")
+                    self.original_umat = None
+                    self.hsv_umat = None
+                    self.apply_hsv_filter_and_update_display()
+                    return
+            else:
+                # 使用 cv2.inRange 创建二值掩码
+                # 在 hsv_small 中，像素值在 [lower_bound, upper_bound] 区间内的为白色(255)，否则为黑色(0)
+                self.current_mask = cv2.inRange(self.hsv_small, self._lower, self._upper, dst=self._mask_out)
+
+                # 使用掩码和按位与操作，从原始 BGR 图像中提取颜色在范围内的区域
+                # 掩码为白色的地方，保留原始图像像素；掩码为黑色的地方，结果为黑色
+                # 注意：指定 mask 时 dst 中掩码为0的像素不会被写入，需要先清零
+                self._masked_out.fill(0)
+                self.masked_result = cv2.bitwise_and(self.original_small, self.original_small,
+                                                     dst=self._masked_out, mask=self.current_mask)
             # print("HSV 滤波器已应用") # 用于调试的输出
 
             # 转换处理后的图像为 QPixmap 并显示
-            qt_processed_pixmap = convert_cv_qt(self.masked_result, width=self.display_width)
+            qt_processed_pixmap = convert_cv_qt(self.masked_result)
             self.processed_display_label.setPixmap(qt_processed_pixmap)
 
         # --- 如果不处于 HSV 模式，则清除右侧显示 ---
@@ -325,6 +460,62 @@ class ImageProcessorApp(QWidget):
             self.processed_display_label.clear()
             self.processed_display_label.setText('处理后的图像将显示在此处')
 
+    # --- 将显示尺寸的图像上传为 UMat ---
+    def _upload_umats(self):
+        """OpenCL 可用且未使用 numba 内核时，为 original_small 和 hsv_small 创建 UMat 副本；失败时退回 CPU"""
+        self.original_umat = None
+        self.hsv_umat = None
+        if not _USE_OPENCL or hsv_mask_apply is not None:
+            return
+        try:
+            self.original_umat = cv2.UMat(self.original_small)
+            self.hsv_umat = cv2.UMat(self.hsv_small)
+        except cv2.error as e:
+            print(f"创建 UMat 失败，使用 CPU 处理: {e}")
+            self.original_umat = None
+            self.hsv_umat = None
+
+    # --- 按当前阈值重建查找表 ---
+    def _update_luts(self):
+        """阈值变化时重建 H、S、V 三个查找表：[下界, 上界] 区间内为 255，其余为 0"""
+        bounds = (tuple(self._lower), tuple(self._upper))
+        if bounds == self._lut_bounds:
+            return
+        self._lut_bounds = bounds
+        for lut, lo, hi in zip((self._lut_h, self._lut_s, self._lut_v), self._lower, self._upper):
+            lut.fill(0)
+            lut[int(lo):int(hi) + 1] = 255  # 转为 int，避免 uint8 的 255 + 1 溢出为 0
+
+    # --- 对原始分辨率图像应用当前阈值 ---
+    def apply_hsv_filter_full_resolution(self):
+        """
+        使用最近一次应用的 HSV 阈值对原始分辨率图像计算掩码和结果（滑块调节时只处理缩小后的图像）。
+        :return: (掩码, 掩码结果)，未加载图像时返回 (None, None)
+        """
+        if self.original_frame is None:
+            return None, None
+        if self.hsv_frame is None:
+            self.hsv_frame = cv2.cvtColor(self.original_frame, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(self.hsv_frame, self._lower, self._upper)
+        return mask, cv2.bitwise_and(self.original_frame, self.original_frame, mask=mask)
+
+    # --- 导出原始分辨率的掩码和结果 ---
+    def export_mask(self):
+        """点击导出按钮时调用：按原始分辨率计算掩码，保存结果图像（文件名加 _mask 后缀另存掩码）"""
+        mask, result = self.apply_hsv_filter_full_resolution()
+        if mask is None:
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出掩码结果", "hsv_result.png",
+                                                   "图片文件 (*.png *.jpg *.bmp)")
+        if not file_path:
+            return
+        root, ext = os.path.splitext(file_path)
+        mask_path = f"{root}_mask{ext or '.png'}"
+        if cv2.imwrite(file_path, result) and cv2.imwrite(mask_path, mask):
+            print(f"已导出: {file_path}, {mask_path}")
+        else:
+            print(f"导出失败: {file_path}")
+
     # --- 重置滑块到默认值 ---
     def reset_sliders(self):
         """将所有滑块的值重置为初始设定的默认值"""
@@ -335,15 +526,9 @@ class ImageProcessorApp(QWidget):
         self.sliders["S Max"].setValue(self.s_max_val)
         self.sliders["V Min"].setValue(self.v_min_val)
         self.sliders["V Max"].setValue(self.v_max_val)
-        # 同时更新滑块旁边的标签显示
-        # 需要重新获取 display_name，这里简化处理，直接用内部名
-        # 更准确的做法是迭代 slider_params 或维护一个映射
+        # 同时更新滑块旁边的标签显示（使用 initUI 中记录的中文显示名称）
         for internal_name, slider in self.sliders.items():
-            # 尝试从标签的当前文本中提取中文名称部分
-            current_text = self.slider_labels[internal_name].text()
-            display_name_part = current_text.split(':')[0] # 取冒号前的部分
-            # 更新标签文本
-            self.slider_labels[internal_name].setText(f"{display_name_part}: {slider.value()}")
+            self.slider_labels[internal_name].setText(f"{self.display_names[internal_name]}: {slider.value()}")
 
 
     # --- 复位所有状态 ---
@@ -356,6 +541,7 @@ class ImageProcessorApp(QWidget):
             # 如果本来就不在 HSV 模式，手动确保控件状态正确
             self.is_hsv_mode = False
             self.hsv_groupbox.setEnabled(False)
+            self.btn_export.setEnabled(False)
             self.btn_hsv_mode.setText("启用 HSV 模式")
             # 清理处理后的图像显示
             self.processed_display_label.clear()
@@ -371,6 +557,7 @@ class ImageProcessorApp(QWidget):
 
 # --- 程序入口点 ---
 if __name__ == '__main__':
+    print_cpu_features()          # 确认 OpenCV 的 SIMD 指令集
     app = QApplication(sys.argv) # 创建 PyQt 应用实例
     ex = ImageProcessorApp()      # 创建主窗口实例
     ex.show()                     # 显示窗口
@@ -4,6 +4,7 @@ import socket
 import time
 import sys
 import machine
+import select
 import _thread
 
 
@@ -137,56 +138,79 @@ def take_photo():
         return f"拍照错误: {str(e)}"
 
 
+# --- 控制命令处理函数：参数为连接和命令字节，负责执行命令并应答 ---
+def _cmd_led_on(conn, cmd):
+    led.on()
+    conn.send(b"1")
+
+
+def _cmd_led_off(conn, cmd):
+    led.off()
+    conn.send(b"1")
+
+
+def _cmd_photo(conn, cmd):
+    photo_result = take_photo()  # 这里可以打印结果或不打印
+    conn.send(b"1")
+
+
+def _cmd_forward_stm32(conn, cmd):
+    # 转发数字字符给STM32
+    uart.write(bytes((cmd,)))
+    print(f"转发给STM32: {chr(cmd)}")
+    conn.send(b"1")
+
+
+def _cmd_invalid(conn, cmd):
+    led.off()
+    conn.send(b"0")
+    print("无效命令")
+
+
+# 命令字节 -> 处理函数 的分派表（模块加载时建立一次），每条命令只需一次字典查找
+_CMD_HANDLERS = {
+    ord('L'): _cmd_led_on,
+    ord('l'): _cmd_led_off,
+    ord('P'): _cmd_photo,
+}
+for _c in b'12345':
+    _CMD_HANDLERS[_c] = _cmd_forward_stm32
+
+
 def handle_control_client(conn, addr):
     """持续处理控制客户端连接（单字符模式）"""
     print(f"控制客户端连接: {addr}")
+    # 复用的接收缓冲区：客户端可能连续发送多条指令（流水线），一次最多读取16个字符
+    buf = bytearray(16)
     try:
-        # 设置非阻塞模式（MicroPython特有方式）
+        # 设置非阻塞模式（MicroPython特有方式），读取前先用 poll 等待数据到达
         conn.setblocking(False)
+        poller = select.poll()
+        poller.register(conn, select.POLLIN)
         
         while control_running:
             try:
-                # 尝试接收1字节数据
-                data = conn.recv(2) # 指定最大传输字节数 2 
-                
-                if data:  # 收到有效数据
-                    cmd = data.decode()
-                    print(f"收到控制命令: {cmd}")
-                    
-                    if cmd == 'L':
-                        led.on()
-                        conn.send(b"1")
-                    elif cmd == 'l':
-                        led.off()
-                        conn.send(b"1")
-                    elif cmd == 'P':
-                        photo_result = take_photo()  # 这里可以打印结果或不打印
-                        conn.send(b"1")
-
-
-
-
-                    elif cmd in ('1','2','3','4','5'):
-                        # 转发数字字符给STM32
-                        uart.write(cmd.encode('ascii'))
-                        print(f"转发给STM32: {cmd}")
-                        conn.send(b"1")
-
-
-
+                # 阻塞等待数据（有数据立即返回，无需固定间隔轮询）；超时1秒以便检查 control_running
+                if not poller.poll(1000):
+                    continue
+                # 直接读入缓冲区，不为每次接收新建 bytes 对象；非阻塞模式下无数据时返回 None
+                n = conn.readinto(buf)
+                if n is None:
+                    continue
 
-                    else:
-                        led.off()
-                        conn.send(b"0")
-                        print("无效命令")
+                if n:  # 收到有效数据
+                    # 每个字符是一条指令，按顺序逐条处理并逐条应答
+                    for i in range(n):
+                        cmd = buf[i]
+                        print(f"收到控制命令: {chr(cmd)}")
+                        _CMD_HANDLERS.get(cmd, _cmd_invalid)(conn, cmd)
                         
-                elif data == b'':  # 客户端断开连接
+                else:  # 读到0字节：客户端断开连接
                     print("客户端正常断开")
                     break
                     
             except OSError as e:
                 if e.args[0] == 11:  # EAGAIN/EWOULDBLOCK
-                    time.sleep_ms(100)  # 短暂等待避免CPU满载
                     continue
                 elif e.args[0] == 128:  # ENOTCONN
                     print("客户端异常断开")
@@ -218,6 +242,19 @@ def control_server():
             if control_running:
                 print(f"控制服务器接受连接错误: {e}")
 
+# MJPEG 帧头中不变的部分预先编码为 bytes，每帧只需格式化长度数字
+# 边界标记（与响应头中定义的boundary一致） + 内容类型为JPEG图像 + 当前JPEG帧的字节长度
+_HDR_A = b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+# 帧头的结束标记(空行)
+_HDR_B = b"\r\n\r\n"
+
+# 目标帧间隔（毫秒），约20fps；只休眠扣除拍摄和发送耗时后的剩余时间
+# 网络较慢时 sendall 本身就会阻塞，此时不再额外休眠
+TARGET_PERIOD_MS = 1000 // 20
+# 获取到空帧后重试前的等待时间（毫秒）
+EMPTY_FRAME_WAIT_MS = 20
+
+
 def handle_client(conn, addr):
     """处理视频客户端连接"""
     print(f"视频客户端连接: {addr}")
@@ -246,31 +283,26 @@ def handle_client(conn, addr):
         # 持续发送视频帧
         frame_count = 0
         last_frame_time = time.time()
-        last_frame = None
+        empty_count = 0  # 连续获取空帧的次数
         
         while True:
             try:
-                # 获取帧
+                t0 = time.ticks_ms()
+                # 获取帧（不再保留上一帧作为备用，同一时间只持有一个帧缓冲，减轻PSRAM分配压力）
                 frame = camera.capture()
                 if not frame:
-                    if last_frame:  # 使用上一帧避免中断
-                        frame = last_frame
-                    else:
-                        print("获取到空帧，跳过")
-                        continue
-                else:
-                    last_frame = frame
+                    # 传感器持续失败时短暂休眠，避免空转占满CPU；提示每50次只打印一次
+                    if empty_count % 50 == 0:
+                        print(f"获取到空帧，跳过（连续 {empty_count + 1} 次）")
+                    empty_count += 1
+                    time.sleep_ms(EMPTY_FRAME_WAIT_MS)
+                    continue
+                empty_count = 0
                 
-                # 发送帧
-                frame_header = (
-                    # 边界标记，与响应头中定义的boundary一致
-                    "--frame\r\n"
-                    # 声明当前部分的内容类型为JPEG图像
-                    "Content-Type: image/jpeg\r\n"
-                    # 指定当前JPEG帧的字节长度； 帧头的结束标记(空行)
-                    f"Content-Length: {len(frame)}\r\n\r\n"
-                ).encode()
-                conn.sendall(frame_header + frame)
+                # 发送帧：约60字节的帧头拼成一次发送，帧数据单独发送，避免拼接出一份完整的帧副本
+                # （帧头不拆成多个小包，否则 Nagle 算法与客户端的延迟确认会让每帧多等一次ACK）
+                conn.sendall(_HDR_A + b"%d" % len(frame) + _HDR_B)
+                conn.sendall(frame)
                 frame_count += 1
                 
                 # 打印FPS
@@ -281,8 +313,10 @@ def handle_client(conn, addr):
                     frame_count = 0
                     last_frame_time = current_time
                 
-                # time.sleep(0.05)  # ~20 FPS 控制发送视频帧的间隔时间
-                time.sleep(0.1)  # ~10 FPS 
+                # 按本帧实际耗时调整休眠时间
+                wait = TARGET_PERIOD_MS - time.ticks_diff(time.ticks_ms(), t0)
+                if wait > 0:
+                    time.sleep_ms(wait)
                 
             except OSError as e:
                 print(f"客户端断开: {addr} | 错误: {e}")
@@ -2,8 +2,18 @@ import cv2
 import numpy as np
 import requests
 import time
+import queue
+import threading
 from datetime import datetime
 
+# 使用 libjpeg-turbo（PyTurboJPEG）解码JPEG，SIMD加速且可直接输出BGR
+# 安装：pip install PyTurboJPEG；未安装时回退到 cv2.imdecode
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    tj = TurboJPEG()
+except Exception:
+    tj = None
+
 ESP32_IP = "192.168.1.111"  # 替换为ESP32实际IP   工作室的网
 # ESP32_IP = "192.168.43.107"  # 替换为ESP32实际IP     手机热点
 PORT = 80  # 端口号
@@ -15,6 +25,11 @@ class VideoProcessor:
         self.frame_count = 0
         self.start_time = time.time()
         self.fps = 0
+        # 绘制状态信息的缓存：FPS文字尺寸只在显示值变化时重新计算，时间戳每秒格式化一次
+        self._last_fps_bucket = -1
+        self._last_fps_size = None
+        self._last_ts_sec = -1
+        self._last_ts_str = ""
 
     def calculate_fps(self):
         """计算并返回FPS"""
@@ -35,39 +50,71 @@ class VideoProcessor:
         
         # FPS显示在右上角
         fps_text = f"FPS: {self.fps:.1f}"
-        fps_size = cv2.getTextSize(fps_text, font, 0.7, 2)[0]
+        fps_bucket = round(self.fps * 10)  # 与显示的一位小数对应
+        if fps_bucket != self._last_fps_bucket:
+            self._last_fps_bucket = fps_bucket
+            self._last_fps_size = cv2.getTextSize(fps_text, font, 0.7, 2)[0]
+        fps_size = self._last_fps_size
         cv2.putText(frame, fps_text, (w - fps_size[0] - 10, 30), 
                    font, 0.7, text_color, 2)
         
         # 时间戳显示在左上角
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cv2.putText(frame, timestamp, (10, 30), 
+        sec = int(time.time())
+        if sec != self._last_ts_sec:
+            self._last_ts_sec = sec
+            self._last_ts_str = datetime.fromtimestamp(sec).strftime("%Y-%m-%d %H:%M:%S")
+        cv2.putText(frame, self._last_ts_str, (10, 30), 
                    font, 0.5, text_color, 1)
 
-def process_mjpeg_stream():
-    buffer = b""
+def put_latest(q, item):
+    """放入队列，队列已满时丢弃最旧的一项；返回是否丢弃了旧数据"""
+    dropped = False
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped = True
+            except queue.Empty:
+                pass
+
+
+def receive_loop(jpeg_queue, stop_event, stats):
+    """接收线程：连接服务器、解析MJPEG流，把每帧JPEG数据放入队列（断线自动重连）"""
+    # bytearray 原地追加/删除，避免每个数据块都拼接出新的 bytes 对象
+    buffer = bytearray()
     boundary = b"--frame"
-    processor = VideoProcessor()
+    # 查找帧结束边界时从该位置开始，已扫描过的字节不再重复扫描
+    scan_from = 0
     reconnect_delay = 1  # 重连延迟(秒)
     
-    while True:
+    while not stop_event.is_set():
         try:
             print(f"尝试连接到ESP32-CAM服务器: {url}")
             with requests.get(url, stream=True, timeout=10) as response:
                 print("连接成功，开始接收视频流...")
+                # 重新连接后丢弃上一次连接残留的半帧数据
+                buffer.clear()
+                scan_from = 0
                 
                 for chunk in response.iter_content(chunk_size=8192):  # 增大块大小提高性能
+                    if stop_event.is_set():
+                        return
                     if not chunk:
                         print("收到空数据块，可能连接中断")
                         time.sleep(0.1)
                         continue
                         
-                    buffer += chunk
+                    buffer.extend(chunk)
                     
                     while True:
                         # 查找边界标记
                         boundary_pos = buffer.find(boundary)
                         if boundary_pos == -1:
+                            # 没有边界：只保留末尾可能是半个边界标记的字节
+                            del buffer[:max(0, len(buffer) - len(boundary) + 1)]
                             break
                             
                         # 提取一个完整帧
@@ -76,57 +123,94 @@ def process_mjpeg_stream():
                             break
                             
                         frame_start += 4  # 跳过\r\n\r\n
-                        frame_end = buffer.find(boundary, frame_start)
+                        frame_end = buffer.find(boundary, max(frame_start, scan_from))
                         
                         if frame_end == -1:  # 未找到下一帧边界
+                            # 下次从新数据处继续查找（回退边界长度，防止边界跨两个数据块）
+                            scan_from = max(frame_start, len(buffer) - len(boundary) + 1)
                             if len(buffer) > 2*1024*1024:  # 防止缓冲区过大(2MB)
-                                buffer = buffer[frame_start:]
+                                del buffer[:frame_start]
+                                scan_from = 0
                             break
                             
                         # 提取JPEG数据
                         jpeg_data = buffer[frame_start:frame_end]
-                        buffer = buffer[frame_end:]
+                        del buffer[:frame_end]
+                        scan_from = 0
                         
                         if len(jpeg_data) < 100:  # 过滤过小数据包
                             continue
-                            
-                        try:
-                            # 解码图像
-                            img = cv2.imdecode(np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-                            if img is None:
-                                print("JPEG解码失败")
+
+                        # 缓冲区中已有下一帧的完整数据时说明显示跟不上，跳过这一帧（不解码也不显示）
+                        next_start = buffer.find(b"\r\n\r\n")
+                        if next_start != -1:
+                            next_end = buffer.find(boundary, next_start + 4)
+                            if next_end != -1:
+                                scan_from = next_end  # 下一帧的结束边界已找到，无需重复扫描
+                                stats["dropped"] += 1
                                 continue
-                                
-                            # 计算FPS
-                            fps = processor.calculate_fps()
-                            
-                            # 绘制状态信息
-                            processor.draw_status(img)
-                            
-                            # 显示原始图像
-                            cv2.imshow("ESP32-CAM Stream", img)
-                            
-                        except Exception as e:
-                            print(f"图像处理错误: {e}")
-                            
-                    # 检查退出键
-                    if cv2.waitKey(1) == ord('q'):
-                        raise KeyboardInterrupt
+
+                        # 交给显示线程解码；显示线程跟不上时丢弃最旧的帧
+                        if put_latest(jpeg_queue, jpeg_data):
+                            stats["dropped"] += 1
                         
         except requests.exceptions.RequestException as e:
             print(f"连接错误: {e}，尝试重新连接...")
             time.sleep(reconnect_delay)
             
-        except KeyboardInterrupt:
-            print("用户主动终止")
-            break
-            
         except Exception as e:
             print(f"未处理的异常: {e}")
             time.sleep(reconnect_delay)
-            
+
+
+def process_mjpeg_stream():
+    # 接收/解析 与 解码/显示 分别在两个线程中进行，中间用容量为2的队列连接
+    # （imdecode 和 TurboJPEG 解码时会释放GIL，两者可以并行）
+    jpeg_queue = queue.Queue(maxsize=2)
+    stop_event = threading.Event()
+    stats = {"dropped": 0}  # 因显示跟不上而跳过的帧数
+    processor = VideoProcessor()
+    threading.Thread(target=receive_loop, args=(jpeg_queue, stop_event, stats), daemon=True).start()
+
+    try:
+        while True:
+            try:
+                jpeg_data = jpeg_queue.get(timeout=0.05)
+            except queue.Empty:
+                jpeg_data = None
+
+            if jpeg_data is not None:
+                try:
+                    # 解码图像
+                    if tj is not None:
+                        img = tj.decode(jpeg_data, pixel_format=TJPF_BGR)
+                    else:
+                        img = cv2.imdecode(np.frombuffer(jpeg_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    if img is None:
+                        print("JPEG解码失败")
+                    else:
+                        # 计算FPS
+                        fps = processor.calculate_fps()
+
+                        # 绘制状态信息
+                        processor.draw_status(img)
+
+                        # 显示原始图像
+                        cv2.imshow("ESP32-CAM Stream", img)
+
+                except Exception as e:
+                    print(f"图像处理错误: {e}")
+
+            # 检查退出键
+            if cv2.waitKey(1) == ord('q'):
+                print("用户主动终止")
+                break
+    except KeyboardInterrupt:
+        print("用户主动终止")
+
+    stop_event.set()
     cv2.destroyAllWindows()
-    print("客户端已关闭")
+    print(f"客户端已关闭，共跳过 {stats['dropped']} 帧")
 
 if __name__ == "__main__":
     print("启动MJPG流客户端...")
@@ -1,16 +1,18 @@
+import os
 import sys
+
+# 关闭 ultralytics 的逐帧推理日志；需在导入 ultralytics 之前设置，外部已设置时不覆盖
+os.environ.setdefault("YOLO_VERBOSE", "False")
+
 from PyQt5.QtWidgets import QApplication # type: ignore
 from ui.main_window import CameraApp
+from ui.styles_qss import QSS
 
 def main():
     app = QApplication(sys.argv)
     
-    # 加载样式表 - 使用UTF-8编码
-    try:
-        with open('./ui/styles.qss', 'r', encoding='utf-8') as f:
-            app.setStyleSheet(f.read())
-    except FileNotFoundError:
-        print("警告: 未找到样式表文件")
+    # 加载样式表
+    app.setStyleSheet(QSS)
     
     window = CameraApp()
     window.show()
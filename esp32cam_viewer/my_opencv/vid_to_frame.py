@@ -1,8 +1,25 @@
 import cv2
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 可选：使用 PyAV（libav）解码，多线程解码、按关键帧定位，颜色转换由 libswscale 完成
+# 安装：pip install av；未安装时使用 OpenCV 的 VideoCapture
+try:
+    import av
+except ImportError:
+    av = None
 
 class VideoSplitter:
-    def __init__(self, video_path, start_time=0, end_time=None, save_path='output_frames', return_frames=False):
+    # 保存方式 -> (视频文件名, 编码器)；'jpegs' 表示逐帧保存为图片
+    OUTPUT_MODES = {
+        'jpegs': None,
+        'mjpeg': ('frames.avi', 'MJPG'),
+        'h264': ('frames.mp4', 'avc1'),
+    }
+
+    def __init__(self, video_path, start_time=0, end_time=None, save_path='output_frames', return_frames=False, target_fps=None,
+                 output_mode='jpegs', jpeg_quality=85):
         """
         初始化 VideoSplitter 类
         :param video_path: 视频文件路径
@@ -10,56 +27,198 @@ class VideoSplitter:
         :param end_time: 到视频的哪一秒结束提取帧（默认提取到视频结束）
         :param save_path: 保存拆分帧图像的文件夹路径（默认保存到当前目录下的 'output_frames' 文件夹）
         :param return_frames: 是否返回每一帧的图像数据（默认不返回）
+        :param target_fps: 抽帧的目标帧率（默认 None，即保存每一帧）
+        :param output_mode: 保存方式：'jpegs' 每帧一张图片；'mjpeg' / 'h264' 所有帧写入同一个视频文件
+        :param jpeg_quality: 保存图片的 JPEG 质量（0-100，默认 85，比 OpenCV 默认的 95 编码更快、文件更小）
         """
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"不支持的保存方式: {output_mode}，可选: {', '.join(self.OUTPUT_MODES)}")
         self.video_path = video_path
         self.start_time = start_time
         self.end_time = end_time
         self.save_path = save_path
         self.return_frames = return_frames
+        self.target_fps = target_fps
+        self.output_mode = output_mode
+        self.jpeg_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.sample_fps = None  # 抽帧后的帧率，开始读取视频后才知道
         
         if not os.path.exists(save_path):
             os.makedirs(save_path)
 
-    def split_video(self):
+    def iter_frames(self):
+        """
+        逐帧读取指定时间范围内的视频帧（生成器），内存中同一时间只保留一帧
+        :return: 依次产生 (帧序号, BGR 图像)
+        """
+        if av is not None:
+            try:
+                container = av.open(self.video_path)
+            except Exception as e:
+                print(f"PyAV 无法打开视频，改用 OpenCV: {e}")
+            else:
+                yield from self._iter_frames_av(container)
+                return
+        yield from self._iter_frames_cv()
+
+    def _iter_frames_av(self, container):
+        """使用 PyAV 逐帧解码"""
+        try:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"  # 帧级+片级多线程解码
+            fps = float(stream.average_rate or 0) or 30.0
+            start_frame = int(self.start_time * fps)
+            end_frame = int(self.end_time * fps) if self.end_time else None
+            skip = max(1, int(round(fps / self.target_fps))) if self.target_fps else 1
+            self.sample_fps = fps / skip
+            
+            print(f"视频信息: {fps}FPS, 总帧数: {stream.frames}")
+            print(f"处理范围: 第 {start_frame}-{end_frame if end_frame is not None else '结束'} 帧, 每 {skip} 帧取一帧")
+            
+            if start_frame > 0 and stream.time_base:
+                # 定位到起始时间之前最近的关键帧，之后解码并丢弃起始时间之前的帧
+                container.seek(int(self.start_time / stream.time_base), stream=stream)
+            
+            for frame in container.decode(stream):
+                i = int(round(frame.time * fps)) if frame.time is not None else start_frame
+                if i < start_frame:
+                    continue
+                if end_frame is not None and i >= end_frame:
+                    break
+                if (i - start_frame) % skip:
+                    continue
+                yield i, frame.to_ndarray(format="bgr24")
+        finally:
+            container.close()
+
+    def _iter_frames_cv(self):
+        """使用 OpenCV 的 VideoCapture 逐帧解码"""
         cap = cv2.VideoCapture(self.video_path) # VideoCapture 是 OpenCV 中的一个类，用于从视频文件或摄像头中读取视频流
         if not cap.isOpened():
             print(f"错误：无法打开视频文件 {self.video_path}")
-            return None
-        
-        fps = cap.get(cv2.CAP_PROP_FPS)                        # 捕获视频的帧率
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))  # 捕获视频的总帧数
-        video_duration = total_frames / max(1.0, fps)
-        
-        print(f"视频信息: {fps}FPS, 总帧数: {total_frames}, 时长: {video_duration:.2f}秒")
-        
-        start_frame = int(self.start_time * fps)
-        end_frame = int((self.end_time if self.end_time else video_duration) * fps)
+            return
         
-        print(f"处理范围: 第 {start_frame}-{end_frame} 帧")
-        
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)   # 设置起始帧
-        
-        for i in range(start_frame, end_frame):
-            ret, frame = cap.read() # 调用一次，读取一帧
-            if not ret:
-                break
-                
-            filename = os.path.join(self.save_path, f"frame_{i:04d}.jpg")
-            if not cv2.imwrite(filename, frame):
-                print(f"警告: 无法保存 {filename}")
-            else:
-                print(f"已保存: {filename}")
-        
-        cap.release()
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)                        # 捕获视频的帧率
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))  # 捕获视频的总帧数
+            video_duration = total_frames / max(1.0, fps)
+            
+            print(f"视频信息: {fps}FPS, 总帧数: {total_frames}, 时长: {video_duration:.2f}秒")
+            
+            start_frame = int(self.start_time * fps)
+            end_frame = int((self.end_time if self.end_time else video_duration) * fps)
+            
+            # 每隔 skip 帧取一帧
+            skip = max(1, int(round(fps / self.target_fps))) if self.target_fps else 1
+            self.sample_fps = fps / skip
+            
+            print(f"处理范围: 第 {start_frame}-{end_frame} 帧, 每 {skip} 帧取一帧")
+            
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)   # 设置起始帧（只在开始时定位一次）
+            
+            for i in range(start_frame, end_frame):
+                # grab() 只读取压缩数据并前进一帧，不解码；只有需要的帧才调用 retrieve() 解码
+                if not cap.grab():
+                    break
+                if (i - start_frame) % skip:
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                yield i, frame
+        finally:
+            cap.release()
+
+    def split_video(self):
+        """
+        将视频帧保存为 JPEG 图片，或按 output_mode 写入同一个视频文件
+        :return: return_frames 为 True 时返回所有帧的列表，否则返回 None
+        """
+        if self.output_mode != 'jpegs':
+            return self._write_container()
+        frames = [] if self.return_frames else None
+        # JPEG 编码和写盘交给线程池（cv2.imencode 执行时会释放GIL），主线程同时解码下一帧
+        # retrieve() 每次返回新的数组，提交给线程池的帧不会被后续读取覆盖，无需复制
+        workers = os.cpu_count() or 2
+        pending = deque()  # (文件名, future)，限制数量以免解码快于写盘时帧在内存中堆积
+        max_pending = 2 * workers
+        # 文件名模板只拼接一次路径，循环中只格式化帧序号
+        name_tpl = os.path.join(self.save_path, "frame_%04d.jpg")
+        save_jpeg = self._save_jpeg
+        params = self.jpeg_params
+        report_saved = self._report_saved
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            submit = pool.submit
+            for i, frame in self.iter_frames():
+                filename = name_tpl % i
+                pending.append((filename, submit(save_jpeg, filename, frame, params)))
+                if len(pending) > max_pending:
+                    report_saved(*pending.popleft())
+                if frames is not None:
+                    frames.append(frame)
+            while pending:
+                self._report_saved(*pending.popleft())
+        return frames
+
+    def _write_container(self):
+        """将所有帧写入一个视频文件（只需打开一次文件，避免每帧创建一个图片文件）"""
+        filename, codec = self.OUTPUT_MODES[self.output_mode]
+        path = os.path.join(self.save_path, filename)
+        frames = [] if self.return_frames else None
+        writer = None
+        count = 0
+        try:
+            for i, frame in self.iter_frames():
+                if writer is None:
+                    # 第一帧到达后才知道帧尺寸和抽帧后的帧率
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec), self.sample_fps, (w, h))
+                    if not writer.isOpened():
+                        print(f"错误: 无法创建视频文件 {path}（编码器 {codec} 不可用）")
+                        return frames
+                writer.write(frame)
+                count += 1
+                if frames is not None:
+                    frames.append(frame)
+        finally:
+            if writer is not None:
+                writer.release()
+        print(f"已保存 {count} 帧到: {path}")
+        return frames
+
+    @staticmethod
+    def _save_jpeg(filename, frame, params):
+        """编码为 JPEG 后一次性写入文件；返回是否成功"""
+        ok, buf = cv2.imencode('.jpg', frame, params)
+        if not ok:
+            return False
+        with open(filename, 'wb') as f:
+            f.write(buf)
+        return True
+
+    @staticmethod
+    def _report_saved(filename, future):
+        """等待一帧写入完成并输出结果"""
+        try:
+            ok = future.result()
+        except (cv2.error, OSError) as e:
+            print(f"警告: 无法保存 {filename}: {e}")
+            return
+        if not ok:
+            print(f"警告: 无法保存 {filename}")
+        else:
+            print(f"已保存: {filename}")
 
 
-# 示例使用
-video_path = r"C:\Users\lenovo\Desktop\esp32\esp32\esp32cam_viewer\data\vids\vid_20250430_12_16_33_339.mp4" 
-save_path = r"C:\Users\lenovo\Desktop\esp32\esp32\esp32cam_viewer\data\vids\vid_20250430_12_16_33_339"
-return_frames = True  # 是否返回帧
-# 开始时间、结束时间设置为 None 则默认处理整个视频（必须要传入）
-splitter = VideoSplitter(video_path, start_time=0, end_time=None, save_path=save_path, return_frames=return_frames)
-frames = splitter.split_video()
+if __name__ == "__main__":
+    # 示例使用
+    video_path = r"C:\Users\lenovo\Desktop\esp32\esp32\esp32cam_viewer\data\vids\vid_20250430_12_16_33_339.mp4"
+    save_path = r"C:\Users\lenovo\Desktop\esp32\esp32\esp32cam_viewer\data\vids\vid_20250430_12_16_33_339"
+    return_frames = False  # 是否返回帧（长视频会占用大量内存，需要逐帧处理时使用 iter_frames）
+    # 开始时间、结束时间设置为 None 则默认处理整个视频（必须要传入）
+    splitter = VideoSplitter(video_path, start_time=0, end_time=None, save_path=save_path, return_frames=return_frames)
+    splitter.split_video()
 
-# 转换为RGB格式
-frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
\ No newline at end of file
+    # 需要在内存中逐帧处理（而不是保存到磁盘）时，改用 iter_frames，不要与 split_video 同时调用：
+    # for i, frame in splitter.iter_frames():
+    #     frame_rgb = frame[:, :, ::-1]  # BGR→RGB 用切片得到视图，不复制图像内存
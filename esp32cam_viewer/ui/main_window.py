@@ -1,12 +1,11 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QComboBox, QLineEdit, QPushButton, QLabel, 
-                            QTextEdit, QFileDialog, QSizePolicy, QMessageBox)
+                            QPlainTextEdit, QFileDialog, QSizePolicy, QMessageBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer, pyqtSlot 
 from PyQt5.QtGui import QImage, QPixmap
 
 import numpy as np
-import cv2, os, random, sys, json
-from datetime import datetime
+import cv2, os, random, sys, json, threading, socket, time
 
 # 导入自定义模块
 from core.video_thread import VideoStreamThread
@@ -18,10 +17,30 @@ from core.camera_manager import CameraManager
 from core.camera_display import CameraDisplay 
 from utils.logger import setup_logger 
 
+# 按钮/指示标签的样式表字符串（各处共用同一个常量，不在每次切换状态时重复书写）
+_STYLE_DEFAULT = "color: black;"
+_STYLE_RED = "background-color: #FF5722; color: black;"
+_STYLE_GREEN = "background-color: #4CAF50; color: black;"
+_STYLE_LIGHT_GREEN = "background-color: #81C784; color: black;"
+_LABEL_RED = "background-color: #FF5722; border-radius: 10px;"
+_LABEL_GREEN = "background-color: #81C784; border-radius: 10px;"
+
 class CameraApp(QMainWindow):
     """
     ESP32-CAM 视频监控系统主窗口
     """
+    # 有新帧等待显示（视频线程发出，排队到GUI线程执行；未显示的帧只会排队一次）
+    _frame_pending = pyqtSignal()
+    # 自动重连探测结果 (是否可连接, ip, port)，由探测线程发出
+    _probe_finished = pyqtSignal(bool, str, str)
+
+    # 控制指令 -> (成功提示, 失败提示)
+    _ACTION_MAP = {
+        'L': ("开灯", "关灯失败"),
+        'l': ("关灯", "开灯失败"),
+        'P': ("拍照成功", "拍照失败"),
+    }
+
     def __init__(self):
         super().__init__()
         
@@ -37,7 +56,17 @@ class CameraApp(QMainWindow):
         self.camera_manager = CameraManager()   # 摄像头管理器
 
         self.reconnect_timer = None             # 自动重连定时器
+        self._probing = False                   # 是否有自动重连探测正在进行
         self.frame_counter = 0                  # 帧计数器（用于性能监控）
+
+        # 最新帧交接：视频线程只覆盖这一帧，GUI线程来不及显示的旧帧直接丢弃，事件队列不会堆积
+        self._latest_frame = None
+        self._latest_lock = threading.Lock()
+        # 缩小后的显示帧使用的预分配缓冲区（轮流使用，尺寸变化时重新分配），避免每帧申请新内存
+        # 3 个缓冲区：正在显示的、等待显示的、视频线程正在写入的各占一个
+        self._display_bufs = []
+        self._shown_buf = None                  # 正在显示的缓冲区（GUI线程在锁内更新）
+        self._frame_pending.connect(self._show_latest_frame, Qt.QueuedConnection)
         self.FPS = 6.0                          # 录制帧率，预估的帧率防止存储的视频过快
 
         self.speed_thread = None                # 速度标定线程
@@ -46,12 +75,15 @@ class CameraApp(QMainWindow):
         self.speed_time_limit = 0.6             # 速度标定时间容差（秒）
 
         self.detection_thread = None            # 检测线程实例
-        self.models = {}  # 存储模型名称和路径的字典
+        self.models = self._load_models()  # 存储模型名称和路径的字典（启动时读取一次 models.json）
 
         
         # 创建data目录（如果不存在）
         self.data_dir = os.path.join(os.getcwd(), "data")
         os.makedirs(self.data_dir, exist_ok=True)
+        # 录像保存目录
+        self.vids_dir = os.path.join(self.data_dir, 'vids')
+        os.makedirs(self.vids_dir, exist_ok=True)
         # --- 为速度标定创建调试目录 ---
         self.speed_debug_dir = os.path.join(self.data_dir, 'speed_debug_output')
         os.makedirs(self.speed_debug_dir, exist_ok=True)
@@ -136,7 +168,7 @@ class CameraApp(QMainWindow):
         
         # 连接/断开按钮
         self.btn_connect = QPushButton("连接摄像头")
-        self.btn_connect.setStyleSheet("color: black;")
+        self.btn_connect.setStyleSheet(_STYLE_DEFAULT)
         
         # 摄像头管理按钮
         self.btn_add_camera = QPushButton("添加当前配置")
@@ -174,7 +206,7 @@ class CameraApp(QMainWindow):
         
         self.btn_light = QPushButton("开灯")
         self.btn_light.setObjectName("btn_light")     
-        self.btn_light.setStyleSheet("color: black;")
+        self.btn_light.setStyleSheet(_STYLE_DEFAULT)
         light_layout.addWidget(self.btn_light)
         
         # --- 拍照控制区域 ---
@@ -184,13 +216,15 @@ class CameraApp(QMainWindow):
         
         self.btn_capture = QPushButton("拍照")
         self.btn_capture.setObjectName("btn_capture")  
-        self.btn_capture.setStyleSheet("color: black;")
+        self.btn_capture.setStyleSheet(_STYLE_DEFAULT)
         capture_layout.addWidget(self.btn_capture)
 
         # --- 日志显示区域 ---
-        self.log_display = QTextEdit()
+        # 纯文本控件：追加时不解析HTML，排版开销远小于 QTextEdit
+        self.log_display = QPlainTextEdit()
         self.log_display.setReadOnly(True)                    # 只读模式
         self.log_display.setMinimumHeight(200)                # 设置最小高度
+        self.log_display.setMaximumBlockCount(5000)           # 最多保留5000行，旧日志自动丢弃
         
         # 将所有组件添加到控制面板
         control_layout.addWidget(camera_group)
@@ -238,7 +272,7 @@ class CameraApp(QMainWindow):
         # 匹配的圆形标签
         self.detection_label = QLabel()
         self.detection_label.setFixedSize(20, 20)
-        self.detection_label.setStyleSheet("background-color: #81C784; border-radius: 10px;")
+        self.detection_label.setStyleSheet(_LABEL_GREEN)
         speed_control_layout.addWidget(self.detection_label)
         speed_control_layout.addWidget(self.btn_detection)
 
@@ -280,7 +314,7 @@ class CameraApp(QMainWindow):
         self.btn_detection.clicked.connect(self.start_detection) # 检测按钮
 
         # 摄像头选择变化信号
-        self.cam_selector.currentTextChanged.connect(self.switch_camera)
+        self.cam_selector.currentTextChanged.connect(self.switch_camera, Qt.UniqueConnection)
 
         # 模型选择变化信号
         self.model_selector.currentTextChanged.connect(self.switch_model)
@@ -294,26 +328,51 @@ class CameraApp(QMainWindow):
         self.reconnect_timer = QTimer()
         self.reconnect_timer.setInterval(2000)  # 2秒重试间隔
         self.reconnect_timer.timeout.connect(self.attempt_reconnect)
+        self._probe_finished.connect(self._on_probe_finished, Qt.QueuedConnection)
         
     def attempt_reconnect(self):
-        """尝试自动重连"""
-        if not self.video_thread and self.current_camera:
+        """尝试自动重连：先在后台线程探测摄像头端口是否可连接，可连接时才真正建立连接，探测期间界面不会卡住"""
+        if not self.video_thread and self.current_camera and not self._probing:
             ip = self.current_camera.get("ip", "")       # 使用了字典的 get 方法，并且设置了默认值为空字符串，以防 ip 或 port 键不存在时不会引发 KeyError
             port = self.current_camera.get("port", "")
             if ip and port:
-                self.logger.log(f"尝试自动重连... {ip}:{port}", "INFO")
-                self.ip_input.setText(ip)
-                self.port_input.setText(port)
-                self.connect_camera()
+                self._probing = True
+                threading.Thread(target=self._probe_camera, args=(ip, port), daemon=True).start()
+
+    def _probe_camera(self, ip, port, timeout=0.5):
+        """探测线程：尝试建立TCP连接，完成后通过信号把结果交回GUI线程"""
+        try:
+            with socket.create_connection((ip, int(port)), timeout=timeout):
+                ok = True
+        except (OSError, ValueError):
+            ok = False
+        self._probe_finished.emit(ok, ip, port)
+
+    def _on_probe_finished(self, ok, ip, port):
+        """探测完成（GUI线程）：摄像头可连接且仍需要重连时建立连接"""
+        self._probing = False
+        if not ok or self.video_thread or not self.current_camera:
+            return
+        if (self.current_camera.get("ip"), self.current_camera.get("port")) != (ip, port):
+            return  # 探测期间已切换到其他摄像头
+        self.logger.log(f"尝试自动重连... {ip}:{port}", "INFO")
+        self.ip_input.setText(ip)
+        self.port_input.setText(port)
+        self.connect_camera()
 
     def update_camera_selector(self):
         """更新摄像头下拉选择框"""
-        self.cam_selector.clear()
         cameras = self.camera_manager.get_camera_list()
-        
+        # 重新填充期间屏蔽信号，避免 clear/addItems 的每个中间状态都触发 switch_camera
+        self.cam_selector.blockSignals(True)
+        self.cam_selector.clear()
         if cameras:
             self.cam_selector.addItems(cameras)          # 添加摄像头名称
             self.cam_selector.setCurrentIndex(0)         # 默认选择第一个摄像头
+        self.cam_selector.blockSignals(False)
+        
+        if cameras:
+            self.switch_camera(self.cam_selector.currentText())
         else:
             # 默认值
             self.ip_input.setText("192.168.1.100")
@@ -332,8 +391,9 @@ class CameraApp(QMainWindow):
         try:
             # 创建视频线程（网络或本地）
             self.video_thread = VideoStreamThread(device=0) if use_local else VideoStreamThread(ip, port)
-            self.video_thread.frame_ready.connect(self.update_video_frame)
-            self.video_thread.status_signal.connect(self.handle_thread_status)
+            self.video_thread.frame_ready.connect(self._on_frame_ready, Qt.DirectConnection)
+            # 工作线程发出的信号显式使用队列连接，在GUI线程中执行
+            self.video_thread.status_signal.connect(self.handle_thread_status, Qt.QueuedConnection)
             self.video_thread.start()
             self.logger.log("视频线程已启动", "DEBUG")
 
@@ -344,10 +404,10 @@ class CameraApp(QMainWindow):
                     self.control_thread.stop()
                 self.control_thread = ControlThread({"ip": ip, "port": port})
                 # 控制线程信号连接
-                self.control_thread.command_sent.connect(self.on_control_result)
-                self.control_thread.connection_error.connect(self.on_control_error)
-                self.control_thread.connection_status.connect(self.on_control_connection_changed)
-                self.control_thread.light_state_changed.connect(self.on_light_state_changed)
+                self.control_thread.command_sent.connect(self.on_control_result, Qt.QueuedConnection)
+                self.control_thread.connection_error.connect(self.on_control_error, Qt.QueuedConnection)
+                self.control_thread.connection_status.connect(self.on_control_connection_changed, Qt.QueuedConnection)
+                self.control_thread.light_state_changed.connect(self.on_light_state_changed, Qt.QueuedConnection)
                 self.control_thread.start()
                 self.logger.log("控制线程已启动", "DEBUG")
             
@@ -358,7 +418,7 @@ class CameraApp(QMainWindow):
             # UI状态更新
             self.video_display.set_connected(True)
             self.btn_connect.setText("断开连接")
-            self.btn_connect.setStyleSheet("background-color: #FF5722; color: black;")
+            self.btn_connect.setStyleSheet(_STYLE_RED)
             self.btn_record.setEnabled(True)
             # --- 启用速度标定按钮 ---
             self.btn_register_speed.setEnabled(True)
@@ -426,7 +486,7 @@ class CameraApp(QMainWindow):
         # 更新UI状态
         self.video_display.set_connected(False)
         self.btn_connect.setText("连接摄像头")
-        self.btn_connect.setStyleSheet("background-color: #4CAF50; color: black;")
+        self.btn_connect.setStyleSheet(_STYLE_GREEN)
         self.btn_record.setEnabled(False)
         self.btn_detection.setEnabled(False)
         # --- 禁用速度标定按钮 ---
@@ -483,12 +543,12 @@ class CameraApp(QMainWindow):
             success = self.control_thread.turn_light_on()
             self.light_state = True
             self.btn_light.setText("关灯")
-            self.btn_light.setStyleSheet("background-color: #FF5722; color: black;")
+            self.btn_light.setStyleSheet(_STYLE_RED)
         else:
             success = self.control_thread.turn_light_off()
             self.light_state = False
             self.btn_light.setText("开灯")
-            self.btn_light.setStyleSheet("background-color: #4CAF50; color: black;")
+            self.btn_light.setStyleSheet(_STYLE_GREEN)
         
         if success:
             self.status_label.setText("灯光指令已发送")
@@ -504,15 +564,9 @@ class CameraApp(QMainWindow):
 
     def on_control_result(self, cmd, success):
         """指令结果处理"""
-        action_map = {
-            'L': ("开灯", "关灯失败"),
-            'l': ("关灯", "开灯失败"), 
-            'P': ("拍照成功", "拍照失败")
-        }
-        
-        if cmd in action_map:
-            msg = action_map[cmd][0] if success else action_map[cmd][1]
-            self.status_label.setText(msg)
+        entry = self._ACTION_MAP.get(cmd)
+        if entry:
+            self.status_label.setText(entry[0] if success else entry[1])
             self.logger.log(f"指令 {cmd} 执行{'成功' if success else '失败'}")
 
     def on_light_state_changed(self, status):
@@ -536,7 +590,7 @@ class CameraApp(QMainWindow):
         # self.logger.log(f"自动生成保存路径: {self.save_path}")
         
         # 如果需要用户确认，可以改用：
-        suggested_path = self.generate_unique_filename()
+        suggested_path = self.generate_unique_filename(reserve=False)
         path, _ = QFileDialog.getSaveFileName(
             self, "保存视频", suggested_path, "MP4 Files (*.mp4)"
         )
@@ -545,33 +599,87 @@ class CameraApp(QMainWindow):
             self.logger.log(f"用户选择保存路径: {self.save_path}")
         
 
-    def generate_unique_filename(self):
-        """生成绝对不会重复的文件名"""
-        base_name = datetime.now().strftime("vid_%Y%m%d_%H_%M_%S_%f")[:-3]  # 精确到毫秒
+    def generate_unique_filename(self, reserve=True):
+        """
+        生成绝对不会重复的文件名
+        :param reserve: 是否立即创建该文件占用文件名（O_CREAT|O_EXCL，一次系统调用同时完成检查和创建）；
+                        仅作为建议路径时传 False，不创建文件
+        """
+        # 精确到毫秒：直接由整数纳秒时间戳格式化，不构造 datetime 对象
+        sec, ns = divmod(time.time_ns(), 1_000_000_000)
+        tm = time.localtime(sec)
+        base_path = os.path.join(self.vids_dir, f"vid_{tm.tm_year}{tm.tm_mon:02}{tm.tm_mday:02}_"
+                                                f"{tm.tm_hour:02}_{tm.tm_min:02}_{tm.tm_sec:02}_{ns // 1_000_000:03}")
         ext = ".mp4"
-        filename = f"{base_name}{ext}"
-        full_path = os.path.join(self.data_dir, 'vids',filename)
+        full_path = base_path + ext
+        if not reserve:
+            return full_path
         
         # 极端情况处理：如果文件已存在（几乎不可能），追加序号
         counter = 1
-        while os.path.exists(full_path):
-            filename = f"{base_name}_{counter}{ext}"
-            full_path = os.path.join(self.data_dir, 'vids',  filename)
-            counter += 1
-        
-        return full_path
+        while True:
+            try:
+                os.close(os.open(full_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return full_path
+            except FileExistsError:
+                full_path = f"{base_path}_{counter}{ext}"
+                counter += 1
 
 
-    def update_video_frame(self, frame):
+    def _on_frame_ready(self, frame):
+        """
+        在视频线程中直接调用：保存最新帧，已有帧在等待显示时不再重复通知GUI线程。
+        帧比显示控件大时在这里一次缩小到控件尺寸，GUI线程绘制时只需处理小图；
+        录制、检测、测速使用的仍是视频线程中的原始帧。
+        """
+        h, w = frame.shape[:2]
+        tw, th = self.video_display.target_size
+        scale = min(tw / w, th / h) if tw > 0 and th > 0 else 1.0
+        if scale < 1.0:
+            dw, dh = max(1, int(w * scale)), max(1, int(h * scale))
+            display = self._free_display_buf(dw, dh)
+            cv2.resize(frame, (dw, dh), dst=display, interpolation=cv2.INTER_AREA)
+        else:
+            display = frame
+        with self._latest_lock:
+            notify = self._latest_frame is None
+            self._latest_frame = (display, (w, h))
+        if notify:
+            self._frame_pending.emit()
+
+    def _free_display_buf(self, dw, dh):
+        """（视频线程）取一个既不在显示、也不在等待显示的缓冲区"""
+        if not self._display_bufs or self._display_bufs[0].shape[:2] != (dh, dw):
+            self._display_bufs = [np.empty((dh, dw, 3), dtype=np.uint8) for _ in range(3)]
+        with self._latest_lock:
+            pending = self._latest_frame[0] if self._latest_frame is not None else None
+            shown = self._shown_buf
+        for buf in self._display_bufs:
+            if buf is not pending and buf is not shown:
+                return buf
+
+    def _show_latest_frame(self):
+        """在GUI线程中执行：取走并显示最新帧"""
+        visible = not self.isMinimized() and self.video_display.isVisible()
+        with self._latest_lock:
+            latest = self._latest_frame
+            self._latest_frame = None
+            if latest is not None and visible:
+                self._shown_buf = latest[0]
+        if latest is not None:
+            self.update_video_frame(*latest)
+
+    def update_video_frame(self, frame, source_size=None):
         """
         更新视频帧显示
-        :param frame: numpy.ndarray格式的视频帧
+        :param frame: numpy.ndarray格式的视频帧(BGR)
+        :param source_size: 帧缩小前的原始尺寸 (w, h)，未缩小时为 None
         """
-        self.video_display.update_frame(frame)
-        
-        # 更新状态信息（如果正在录制）
-        if self.recording:
-            self.status_label.setText(f"正在录制: {self.save_path}")
+        # 窗口最小化或显示控件不可见时不更新画面（录制、检测、测速直接从视频线程取帧，不受影响）
+        if self.isMinimized() or not self.video_display.isVisible():
+            return
+        self.video_display.update_frame(frame, source_size)
+        # 录制状态文字只在开始/停止录制时设置，不再每帧调用 setText
 
     def handle_thread_status(self, status_type, message):
         """
@@ -582,7 +690,8 @@ class CameraApp(QMainWindow):
         if status_type == "error":
             self.logger.log(message, "ERROR")
             self.disconnect_camera()
-            self.speed_thread.stop() # 停止标定线程
+            if self.speed_thread and self.speed_thread.isRunning():
+                self.speed_thread.stop() # 停止标定线程（只在标定进行中存在）
         elif status_type == "warning":
             self.logger.log(message, "WARNING")
         else:
@@ -617,6 +726,7 @@ class CameraApp(QMainWindow):
         
         self.logger.log(f"已移除摄像头: {current}")
 
+    @pyqtSlot(str)
     def switch_camera(self, name):
         """
         切换选中的摄像头
@@ -646,7 +756,7 @@ class CameraApp(QMainWindow):
                 self.speed_thread.stop() # 停止旧的，等待 finished 信号清理
                 self.cleanup_speed_calibration()
                 self.btn_register_speed.setText("速度标定")
-                self.btn_register_speed.setStyleSheet("background-color: #81C784; color: black;")
+                self.btn_register_speed.setStyleSheet(_STYLE_LIGHT_GREEN)
                 self.logger.log("等待旧标定线程结束...", "DEBUG")
             else:
                 return # 用户选择不重新开始
@@ -679,19 +789,20 @@ class CameraApp(QMainWindow):
                 roi_rect=self.calculated_roi_rect,
                 save_path=self.speed_debug_dir, # 传递调试图像保存路径
                 time_limit=self.speed_time_limit, # 传递时间限制
+                frame_event=self.video_thread.frame_event if self.video_thread else None, # 新帧到达事件
             )
 
             # --- 连接信号 ---
-            self.speed_thread.calculation_complete.connect(self.on_speed_calculation_complete)
-            self.speed_thread.calculation_error.connect(self.on_speed_calculation_error)
-            self.speed_thread.status_update.connect(self.on_speed_status_update)
+            self.speed_thread.calculation_complete.connect(self.on_speed_calculation_complete, Qt.QueuedConnection)
+            self.speed_thread.calculation_error.connect(self.on_speed_calculation_error, Qt.QueuedConnection)
+            self.speed_thread.status_update.connect(self.on_speed_status_update, Qt.QueuedConnection)
 
             # --- 启动线程 ---
             self.speed_thread.start()
             self.logger.log("速度标定线程已启动...", "INFO")
             self.status_label.setText("速度标定进行中...")
             self.btn_register_speed.setText("停止标定") # 可选：改变按钮文本
-            self.btn_register_speed.setStyleSheet("background-color: #FF5722; color: black;")
+            self.btn_register_speed.setStyleSheet(_STYLE_RED)
 
         except Exception as e:
             error_msg = f"启动速度标定失败: {e}"
@@ -734,7 +845,7 @@ class CameraApp(QMainWindow):
             self.video_display.set_roi(None) # 停止绘制ROI
         self.calculated_roi_rect = None # 清除ROI记录
         self.btn_register_speed.setText("速度标定") # 恢复按钮文本
-        self.btn_register_speed.setStyleSheet("background-color: #81C784; color: black;")
+        self.btn_register_speed.setStyleSheet(_STYLE_LIGHT_GREEN)
         self.status_label.setText("已停止速度标定") 
 
     # --- 需要添加更新速度标签的方法 ---
@@ -744,33 +855,40 @@ class CameraApp(QMainWindow):
 
     # --- 获取帧的方法，供速度线程调用 ---
     def get_latest_frame_for_speed_thread(self):
-        """返回当前显示的最新原始帧"""
-        if self.video_display:
-            return self.video_display.get_current_frame()
+        """返回视频线程最新处理完的原始分辨率帧（与 frame_event 同步）；显示控件中的帧可能已缩小，不作为来源"""
+        if self.video_thread:
+            return self.video_thread.latest_frame
         return None
 
 
     # 初始化模型选择下拉框
-    def update_model_selector(self):
-        """初始化模型选择下拉框"""
-        # 清空下拉框
-        self.model_selector.clear()
-        self.model_selector.addItem("待选择...")  # 默认选项
-
-        # 加载 models.json 文件
+    @staticmethod
+    def _load_models():
+        """
+        读取程序目录下的 models.json（与当前工作目录无关），失败时返回空字典
+        其中的相对模型路径同样按程序目录解析为绝对路径
+        """
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        path = os.path.join(base_dir, "models.json")
         try:
-            with open("./models.json", "r") as f:
-                self.models = json.load(f)
+            with open(path, "rb") as f:
+                models = json.loads(f.read())
+            return {name: os.path.join(base_dir, model_path) for name, model_path in models.items()}
         except FileNotFoundError:
             print("models.json 文件未找到")
-            return
         except json.JSONDecodeError:
             print("models.json 文件格式错误")
-            return
+        return {}
 
-        # 将模型名称添加到下拉框中
-        for model_name in self.models.keys():
-            self.model_selector.addItem(model_name)
+    def update_model_selector(self):
+        """初始化模型选择下拉框"""
+        # 重新填充期间屏蔽信号，避免每添加一项都触发 switch_model
+        self.model_selector.blockSignals(True)
+        self.model_selector.clear()
+        self.model_selector.addItem("待选择...")  # 默认选项
+        # 将模型名称一次性添加到下拉框中
+        self.model_selector.addItems(list(self.models))
+        self.model_selector.blockSignals(False)
 
     # 处理下拉框选择模型路径的函数
     def switch_model(self, model_name):
@@ -823,17 +941,19 @@ class CameraApp(QMainWindow):
                                                      model_path=self.models[self.model_selector.currentText()], save_path=self.detection_result_dir)
 
             # --- 连接信号 ---
-            self.detection_thread.detection_result.connect(self.on_detection_complete)
-            self.detection_thread.error_occurred.connect(self.on_detection_error)
-            self.detection_thread.status_updated.connect(self.on_detection_status_update)
+            self.detection_thread.detection_result.connect(self.on_detection_complete, Qt.QueuedConnection)
+            self.detection_thread.error_occurred.connect(self.on_detection_error, Qt.QueuedConnection)
+            self.detection_thread.status_updated.connect(self.on_detection_status_update, Qt.QueuedConnection)
+            # 视频线程直接把新帧推送给检测线程（DirectConnection：在视频线程中调用，无需经过主线程事件循环）
+            self.video_thread.frame_ready.connect(self.detection_thread.push_frame, Qt.DirectConnection)
 
             # --- 启动线程 ---
             self.detection_thread.start()
             self.logger.log("检测线程已启动...", "INFO")
             self.status_label.setText("检测进行中...")
             self.btn_detection.setText("停止检测") # 可选：改变按钮文本
-            self.btn_detection.setStyleSheet("background-color: #FF5722; color: black;")
-            self.detection_label.setStyleSheet("background-color: #FF5722; border-radius: 10px;")
+            self.btn_detection.setStyleSheet(_STYLE_RED)
+            self.detection_label.setStyleSheet(_LABEL_RED)
 
         except Exception as e:
             error_msg = f"启动检测失败: {e}"
@@ -871,14 +991,19 @@ class CameraApp(QMainWindow):
     # --- 新增：检测线程清理辅助函数 ---
     def cleanup_detection(self):
         """清理检测相关的状态和UI"""
+        if self.detection_thread and self.video_thread:
+            try:
+                self.video_thread.frame_ready.disconnect(self.detection_thread.push_frame)
+            except TypeError:
+                pass # 未连接
         self.detection_thread = None # 清除线程引用
         if self.video_display:
             self.video_display.set_roi(None) # 停止绘制ROI
         self.calculated_roi_rect = None # 清除ROI记录
         self.btn_detection.setText("开始检测") # 恢复按钮文本
-        self.btn_detection.setStyleSheet("background-color: #81C784; color: black;")
+        self.btn_detection.setStyleSheet(_STYLE_LIGHT_GREEN)
         self.status_label.setText("已停止检测") 
-        self.detection_label.setStyleSheet("background-color: #81C784; border-radius: 10px;")
+        self.detection_label.setStyleSheet(_LABEL_GREEN)
 
 
     def on_close(self, event):
@@ -890,4 +1015,7 @@ class CameraApp(QMainWindow):
         if self.video_thread and self.video_thread.isRunning():
             self.disconnect_camera()
             self.logger.log("关闭窗口：正在断开摄像头连接...")
+
+        # 写入尚未保存的摄像头配置
+        self.camera_manager.flush()
         event.accept()
@@ -1,3 +1,6 @@
+"""应用程序样式表（原 styles.qss），作为模块常量随代码一起导入，不依赖当前工作目录读取文件"""
+
+QSS = """
 /* 主窗口样式 - 淡绿色主题 */
 QMainWindow {
     background-color: #F5FFFA;
@@ -86,7 +89,7 @@ QComboBox {
 }
 
 /* 日志显示区域 */
-QTextEdit {
+QTextEdit, QPlainTextEdit {
     background-color: white;
     border: 1px solid #A5D6A7;
     border-radius: 4px;
@@ -124,4 +127,5 @@ QPushButton#btn_light {
 
 QPushButton#btn_light:hover {
     background-color: #F4511E;  /* 深珊瑚色悬停 */
-}
\ No newline at end of file
+}"""
+
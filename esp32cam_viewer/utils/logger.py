@@ -1,5 +1,7 @@
-from PyQt5.QtCore import pyqtSignal, QObject
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
 
 class QtLogger(QObject):
     """
@@ -9,11 +11,30 @@ class QtLogger(QObject):
     - 支持多线程环境下的日志记录
     - 自动添加时间戳和日志级别
     - 通过信号槽机制实现与UI组件的安全通信
+    - 批量输出：日志先放入队列，每 FLUSH_INTERVAL_MS 毫秒合并为一次输出，
+      避免日志密集时文本控件频繁重新排版导致界面卡顿
     
     信号：
-    log_signal: 当有新日志时发射，携带格式化后的日志消息(str)
+    log_signal: 输出日志时发射，携带一条或多条（以换行分隔）格式化后的日志消息(str)
     """
     log_signal = pyqtSignal(str)  # 定义一个发射字符串的信号
+    _flush_requested = pyqtSignal()  # 队列由空变为非空时发射，在日志记录器所在（GUI）线程中启动定时器
+
+    FLUSH_INTERVAL_MS = 100  # 合并输出的时间间隔（毫秒）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = deque()  # 尚未输出的日志
+        self._lock = threading.Lock()
+        # 最近一次生成的时间戳 (秒, 字符串)；时间戳精度为秒，同一秒内的日志直接复用
+        # 以元组整体赋值，多线程读写时不会出现秒与字符串不一致
+        self._last_stamp = (-1, "")
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+        # 其他线程发射时自动排队到日志记录器所在的线程执行
+        self._flush_requested.connect(self._timer.start)
 
     def log(self, message, level="INFO"):
         """
@@ -27,14 +48,31 @@ class QtLogger(QObject):
         处理流程：
         1. 获取当前时间戳
         2. 格式化日志消息
-        3. 通过信号发射日志消息
+        3. 放入队列，稍后与其他日志合并输出
         """
-        # 生成当前时间的时间戳 (格式: YYYY-MM-DD HH:MM:SS)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # 生成当前时间的时间戳 (格式: YYYY-MM-DD HH:MM:SS)，每秒只格式化一次
+        sec = int(time.time())
+        last_sec, timestamp = self._last_stamp
+        if sec != last_sec:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            self._last_stamp = (sec, timestamp)
         # 格式化日志消息 [时间戳] 级别: 消息内容
         formatted = f"[{timestamp}] {level}: {message}"
+        with self._lock:
+            schedule = not self._pending
+            self._pending.append(formatted)
+        if schedule:
+            self._flush_requested.emit()
+
+    def flush(self):
+        """立即输出队列中的所有日志（一次发射）"""
+        with self._lock:
+            if not self._pending:
+                return
+            text = "\n".join(self._pending)
+            self._pending.clear()
         # 发射信号(线程安全)
-        self.log_signal.emit(formatted)
+        self.log_signal.emit(text)
 
 def setup_logger(log_widget):
     """
@@ -47,12 +85,13 @@ def setup_logger(log_widget):
     QtLogger: 配置好的日志记录器实例
     
     典型用法：
-    >>> log_display = QTextEdit()
+    >>> log_display = QPlainTextEdit()
     >>> logger = setup_logger(log_display)
     >>> logger.log("系统初始化完成")
     """
     # 创建日志记录器实例
     logger = QtLogger()
-    # 将日志信号连接到UI组件的append方法
-    logger.log_signal.connect(log_widget.append)
+    # 将日志信号连接到UI组件的追加方法（QPlainTextEdit 用不解析HTML的 appendPlainText）
+    append = getattr(log_widget, "appendPlainText", None) or log_widget.append
+    logger.log_signal.connect(append)
     return logger
@@ -1,28 +1,140 @@
+import os
+import sys
+import queue
+import threading
 import cv2
 import time
+import numpy as np
 import torch
 from ultralytics import YOLO
 from deep_sort_realtime.deepsort_tracker import DeepSort
 
 # 检查 GPU 可用性
-device = "cuda" if torch.cuda.is_available() else "cpu"
+use_cuda = torch.cuda.is_available()
+device = "cuda" if use_cuda else "cpu"
 print(f"Using device: {device}")
 
 # 初始化 YOLOv8
-model = YOLO(model="C:/Users/lenovo/Desktop/esp32/esp32cam_viewer/models/yolov8.pt")
+# 有 GPU 且已导出 TensorRT INT8 引擎时优先加载引擎（精度在导出时已确定，推理时不再指定 half）
+MODEL_PATH = "C:/Users/lenovo/Desktop/esp32/esp32cam_viewer/models/yolov8.pt"
+ENGINE_PATH = os.path.splitext(MODEL_PATH)[0] + "_int8.engine"
+IMGSZ = 320
+
+# 导出 INT8 引擎（只需运行一次）：python v8_deepsort_test.py --export-int8 calib.yaml
+# calib.yaml 为校准数据集配置，建议从录制的视频中抽取 200~500 帧有代表性的图像
+if len(sys.argv) == 3 and sys.argv[1] == "--export-int8":
+    exported = YOLO(MODEL_PATH).export(format="engine", imgsz=IMGSZ, int8=True, dynamic=False,
+                                       batch=1, workspace=4, data=sys.argv[2])
+    os.replace(exported, ENGINE_PATH)
+    print(f"TensorRT INT8 引擎已导出: {ENGINE_PATH}")
+    sys.exit(0)
+
+if device == "cuda" and os.path.exists(ENGINE_PATH):
+    model = YOLO(ENGINE_PATH, task="detect")
+    model_is_engine = True
+    use_half = False
+    print(f"使用 TensorRT INT8 引擎: {ENGINE_PATH}")
+else:
+    model = YOLO(model=MODEL_PATH)
+    model_is_engine = False
+    use_half = device == "cuda"  # 半精度只在 GPU 上有效
+
+
+def gpu_letterbox(frames):
+    """
+    在 GPU 上完成 YOLO 的预处理：letterbox 缩放到 IMGSZ×IMGSZ（灰色114填充）、BGR→RGB、/255、HWC→CHW。
+    只上传原始 uint8 帧，缩放和归一化都在显存中进行，代替 ultralytics 在 CPU 上的逐帧预处理。
+    返回 (BCHW float 张量, 缩放比例, [左, 上, 左, 上] 填充)，用于把检测框映射回原图坐标。
+    """
+    h, w = frames[0].shape[:2]
+    scale = min(IMGSZ / h, IMGSZ / w)
+    nh, nw = round(h * scale), round(w * scale)
+    top, left = (IMGSZ - nh) // 2, (IMGSZ - nw) // 2
+
+    x = torch.from_numpy(np.stack(frames)).to(device, non_blocking=True)
+    x = x.permute(0, 3, 1, 2).flip(1).float()  # BHWC(BGR) -> BCHW(RGB)
+    x = torch.nn.functional.interpolate(x, size=(nh, nw), mode="bilinear", align_corners=False)
+    out = torch.full((len(frames), 3, IMGSZ, IMGSZ), 114.0, device=device)
+    out[:, :, top:top + nh, left:left + nw] = x
+    out /= 255
+    return out, scale, np.array([left, top, left, top], dtype=np.float32)
+
+# 初始化 DeepSORT
+# 外观特征使用轻量的 OSNet 行人重识别模型（osnet_x0_25 约 0.2M 参数，CLIP RN50 约 100M），
+# 每个检测框的特征提取开销大幅降低；未安装 torchreid 时使用 deep_sort_realtime 自带的 MobileNetV2
+# 安装：pip install torchreid
+# 精度按设备选择：GPU 上用 FP16；CPU 上用 FP32（多数 x86 CPU 没有原生 FP16 运算，半精度反而更慢）
+try:
+    import torchreid  # noqa: F401
+    embedder_kwargs = dict(embedder="torchreid", embedder_model_name="osnet_x0_25")
+except ImportError:
+    embedder_kwargs = dict(embedder="mobilenet")
+EMBEDDER_NAME = embedder_kwargs.get("embedder_model_name", embedder_kwargs["embedder"])
 
-# 初始化 DeepSORT (使用 CLIP_RN50)
 tracker = DeepSort(
     max_age=30,
     n_init=5,
     max_cosine_distance=0.2,
-    embedder="clip_RN50",  # 使用 CLIP 特征提取
-    half=True,             # 半精度加速（需 GPU）
+    half=use_cuda,         # 半精度加速（仅 GPU）
     bgr=True,
-    embedder_gpu=True,     # 使用 GPU 运行 CLIP
-    embedder_model_name="RN50",  # 明确指定 CLIP 模型
-    embedder_wts="C:/Users/lenovo/.cache/clip/RN50.pt"  # 预训练权重路径
+    embedder_gpu=use_cuda, # 有 GPU 时在 GPU 上提取特征
+    **embedder_kwargs
 )
+print(f"DeepSORT 特征提取模型: {EMBEDDER_NAME}")
+
+# 每 EMBED_INTERVAL 帧才对所有检测框运行一次特征提取；其余帧中与已有轨迹高度重叠（IoU >= REUSE_IOU）
+# 的检测框直接沿用该轨迹最近的外观特征，只对没有匹配轨迹的检测框提取特征
+EMBED_INTERVAL = 3
+REUSE_IOU = 0.5
+
+
+def iou_matrix(a, b):
+    """计算两组 [x, y, w, h] 框两两之间的 IoU，返回 (len(a), len(b)) 的数组"""
+    ax1, ay1 = a[:, 0:1], a[:, 1:2]
+    ax2, ay2 = ax1 + a[:, 2:3], ay1 + a[:, 3:4]
+    bx1, by1 = b[:, 0], b[:, 1]
+    bx2, by2 = bx1 + b[:, 2], by1 + b[:, 3]
+    iw = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    ih = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    inter = iw * ih
+    union = a[:, 2:3] * a[:, 3:4] + b[:, 2] * b[:, 3] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+def last_track_feature(track):
+    """轨迹最近一次的外观特征（尚未并入特征库的优先），没有时返回 None"""
+    if track.features:
+        return track.features[-1]
+    samples = tracker.tracker.metric.samples.get(track.track_id)
+    return samples[-1] if samples else None
+
+
+def update_tracks_sparse(detections, frame, frame_idx):
+    """
+    更新跟踪器；非关键帧上复用重叠轨迹的外观特征，减少特征提取次数。
+    关键帧、没有检测框或没有轨迹时与 tracker.update_tracks 完全相同。
+    """
+    tracks = [t for t in tracker.tracker.tracks if not t.is_deleted()]
+    if frame_idx % EMBED_INTERVAL == 0 or not detections or not tracks:
+        return tracker.update_tracks(detections, frame=frame)
+
+    det_boxes = np.array([d[0] for d in detections], dtype=np.float32)
+    track_boxes = np.array([t.to_ltwh() for t in tracks], dtype=np.float32)
+    ious = iou_matrix(det_boxes, track_boxes)
+    best = ious.argmax(axis=1)
+
+    embeds = [None] * len(detections)
+    missing = []  # 需要重新提取特征的检测框序号
+    for i, j in enumerate(best):
+        feature = last_track_feature(tracks[j]) if ious[i, j] >= REUSE_IOU else None
+        if feature is None:
+            missing.append(i)
+        else:
+            embeds[i] = feature
+    if missing:
+        for i, feature in zip(missing, tracker.generate_embeds(frame, [detections[i] for i in missing])):
+            embeds[i] = feature
+    return tracker.update_tracks(detections, embeds=embeds, frame=frame)
 
 # 打开视频
 video_path = "C:/Users/lenovo/Desktop/esp32/esp32cam_viewer/data/vids/vid_20250430_12_16_33_339.mp4"
@@ -34,75 +146,189 @@ width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
 height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 print(f"Video Info: {width}x{height}@{original_fps:.2f}fps")
 
-# 设置目标帧率 (6 FPS)
+
+def open_frame_reader(path):
+    """
+    返回逐帧读取 BGR 图像的函数 read() -> (ok, frame)
+    有 GPU 且 OpenCV 编译了 cudacodec（NVDEC）时使用硬件解码，H.264 解码不再占用CPU；
+    否则使用 cap（CPU解码）。DeepSORT 裁剪和显示都需要主机内存中的图像，因此解码后仍下载到CPU。
+    """
+    if device == "cuda" and hasattr(cv2, "cudacodec"):
+        try:
+            gpu_reader = cv2.cudacodec.createVideoReader(path)
+        except cv2.error as e:
+            print(f"NVDEC 硬件解码不可用，使用CPU解码: {e}")
+        else:
+            print("使用 NVDEC 硬件解码")
+
+            def read_gpu():
+                ok, gpu_frame = gpu_reader.nextFrame()
+                if not ok:
+                    return False, None
+                # cudacodec 输出 BGRA，在GPU上转换为 BGR 后再下载
+                return True, cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR).download()
+
+            return read_gpu
+    return cap.read
+
+# 设置目标帧率 (6 FPS)，由显示线程按此帧率排期显示，读取和推理不再被节流
 target_fps = 6
 frame_delay = 1.0 / target_fps  # 每帧间隔时间（秒）
 
+# 读取、推理、显示分别在不同线程中进行，相互之间用容量很小的队列连接
+# tracker 有状态，只在主线程（推理）中使用，无需加锁
+read_q = queue.Queue(maxsize=4)   # 解码后的原始帧，None 表示视频结束
+draw_q = queue.Queue(maxsize=4)   # 绘制好的结果帧，None 表示处理结束
+stop_event = threading.Event()    # 按 q 退出时通知其他线程结束
+
+
+def put_until_stopped(q, item):
+    """放入队列（队列满时等待），收到退出通知时放弃；返回是否放入成功"""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def read_loop():
+    """读取线程：解码视频帧放入 read_q"""
+    read_frame = open_frame_reader(video_path)
+    while not stop_event.is_set():
+        ret, frame = read_frame()
+        if not ret:
+            break
+        if not put_until_stopped(read_q, frame):
+            return
+    put_until_stopped(read_q, None)
+
+
+def display_loop():
+    """显示线程：显示 draw_q 中的结果帧（窗口的创建、刷新都在该线程中完成）"""
+    window_name = f"YOLOv8 + DeepSORT ({EMBEDDER_NAME})"
+    next_tick = time.monotonic()  # 下一帧排定的显示时刻
+    while True:
+        try:
+            frame = draw_q.get(timeout=0.05)
+        except queue.Empty:
+            frame = False
+        if frame is None:
+            break
+        if frame is not False:
+            # 等到排定的显示时刻（等待期间照常响应按键）
+            wait_ms = int((next_tick - time.monotonic()) * 1000)
+            if wait_ms > 0 and cv2.waitKey(wait_ms) & 0xFF == ord('q'):
+                stop_event.set()
+                break
+            cv2.imshow(window_name, frame)
+            # 按绝对时刻累加排期，误差不会累积；处理跟不上时从当前时刻重新排期，避免之后连续刷帧追赶
+            next_tick = max(next_tick + frame_delay, time.monotonic())
+
+        # 按 q 退出
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            stop_event.set()
+            break
+    cv2.destroyAllWindows()
+
+
+reader = threading.Thread(target=read_loop, daemon=True)
+display = threading.Thread(target=display_loop, daemon=True)
+reader.start()
+display.start()
+
 # 性能统计
 total_frames = 0
 total_processing_time = 0
 
-while cap.isOpened():
-    # 读取下一帧
-    ret, frame = cap.read()
-    if not ret:
-        break
+# 每次把连续的 BATCH 帧合并为一批送入 YOLO，摊薄每次推理的调度开销、提高GPU利用率
+# 导出的 TensorRT 引擎是固定 batch=1 的，只能逐帧推理
+BATCH = 1 if model_is_engine else 4
+
+
+def next_batch():
+    """从 read_q 取最多 BATCH 帧；返回 (帧列表, 视频是否已结束)"""
+    frames = []
+    while len(frames) < BATCH and not stop_event.is_set():
+        try:
+            frame = read_q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if frame is None:
+            return frames, True
+        frames.append(frame)
+    return frames, stop_event.is_set()
+
+
+frame_idx = 0
+finished = False
+while not finished:
+    # 读取下一批帧
+    frames, finished = next_batch()
+    if not frames:
+        continue
 
     start_time = time.time()
 
-    # YOLOv8 检测（降低分辨率加速）
-    results = model(frame, imgsz=320, stream=True, half=True, conf=0.7)
+    # YOLOv8 检测（降低分辨率加速），一次推理整批帧
+    # GPU 上传入已预处理好的张量，ultralytics 不再做预处理，检测框坐标相对于 IMGSZ×IMGSZ 的输入
+    if device == "cuda":
+        inputs, scale, pad = gpu_letterbox(frames)
+        results = model(inputs, half=use_half, conf=0.7, verbose=False)
+    else:
+        scale, pad = None, None
+        results = model(frames, imgsz=IMGSZ, half=use_half, conf=0.7, verbose=False)
 
-    # 处理检测结果
-    detections = []
-    for r in results:
-        boxes = r.boxes.xyxy.cpu().numpy()
-        confs = r.boxes.conf.cpu().numpy()
-        cls_ids = r.boxes.cls.cpu().numpy()
-        detections.extend([([x1, y1, x2-x1, y2-y1], conf, int(cls)) 
-                         for (x1, y1, x2, y2), conf, cls in zip(boxes, confs, cls_ids)])
+    # 按顺序逐帧更新跟踪器，保证跟踪状态与帧顺序一致
+    for frame, r in zip(frames, results):
+        # 处理检测结果
+        # 在检测结果所在设备（GPU）上先过滤，再把剩余结果一次性拷贝回CPU（原来每个结果需要3次拷贝）
+        data = r.boxes.data                # [N, 6]: x1, y1, x2, y2, conf, cls
+        data = data[data[:, 4] > 0.5]      # 过滤低置信度检测（减少特征提取计算量），索引结果是新的张量
+        data = data.cpu().numpy()
+        if scale is not None:              # letterbox 坐标 -> 原图坐标
+            data[:, 0:4] -= pad
+            data[:, 0:4] /= scale
+        data[:, 2:4] -= data[:, 0:2]       # xyxy -> xywh
+        # tolist() 一次性转换为 Python 数值，避免逐个元素生成 numpy 标量
+        detections = [(row[:4], row[4], int(row[5])) for row in data.tolist()]
 
-    # 过滤低置信度检测（减少 CLIP 计算量）
-    detections = [d for d in detections if d[1] > 0.5]
+        # DeepSORT 跟踪（外观特征提取在此步骤完成）
+        tracked_objects = update_tracks_sparse(detections, frame, frame_idx)
+        frame_idx += 1
 
-    # DeepSORT 跟踪（CLIP 特征提取在此步骤完成）
-    tracked_objects = tracker.update_tracks(detections, frame=frame)
+        # 绘制结果
+        # 一次性把已确认轨迹的坐标转为 int32 数组再 tolist()，避免每个轨迹单独 map(int, ...)
+        confirmed = [obj for obj in tracked_objects if obj.is_confirmed()]
+        if confirmed:
+            tlbrs = np.array([obj.to_tlbr() for obj in confirmed], dtype=np.int32).tolist()
+            for obj, (x1, y1, x2, y2) in zip(confirmed, tlbrs):
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(frame, f"ID: {obj.track_id}", (x1, y1-10),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
-    # 绘制结果
-    for obj in tracked_objects:
-        if not obj.is_confirmed():
-            continue
-        track_id = obj.track_id
-        x1, y1, x2, y2 = map(int, obj.to_tlbr())
-        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.putText(frame, f"ID: {track_id}", (x1, y1-10), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-    # 计算处理时间
-    process_time = time.time() - start_time
-    total_processing_time += process_time
-    total_frames += 1
-
-    # 显示处理信息
-    fps = 1.0 / process_time
-    avg_fps = total_frames / total_processing_time
-    info_text = f"Curr FPS: {fps:.1f} | Avg FPS: {avg_fps:.1f} | Processed: {total_frames}"
-    cv2.putText(frame, info_text, (10, 30), 
-               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-
-    # 显示结果
-    cv2.imshow("YOLOv8 + DeepSORT (CLIP_RN50)", frame)
-
-    # 控制帧率
-    elapsed = time.time() - start_time
-    if elapsed < frame_delay:
-        time.sleep(frame_delay - elapsed)
-
-    # 按 q 退出
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+    # 计算处理时间（整批的耗时平均到每一帧）
+    process_time = (time.time() - start_time) / len(frames)
+    total_processing_time += process_time * len(frames)
+
+    for frame in frames:
+        total_frames += 1
+
+        # 显示处理信息
+        fps = 1.0 / process_time
+        avg_fps = total_frames / total_processing_time
+        info_text = f"Curr FPS: {fps:.1f} | Avg FPS: {avg_fps:.1f} | Processed: {total_frames}"
+        cv2.putText(frame, info_text, (10, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+        # 交给显示线程
+        put_until_stopped(draw_q, frame)
 
 # 释放资源
+put_until_stopped(draw_q, None)
+display.join()
+stop_event.set()
+reader.join()
 cap.release()
-cv2.destroyAllWindows()
-print(f"Total frames processed: {total_frames}, Average FPS: {total_frames/total_processing_time:.2f}")
+print(f"Total frames processed: {total_frames}, Average FPS: {total_frames/max(total_processing_time, 1e-9):.2f}")